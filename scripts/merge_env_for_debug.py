@@ -1,22 +1,31 @@
 """Merge env files for VS Code/Cursor debugger (same order as Make cli-native)."""
 
 import os
+import re
+import tempfile
 from pathlib import Path
 
+# KEY=VALUE on a single line; comment and blank lines never match. Only horizontal
+# whitespace is trimmed so a match cannot run on into the next line.
+ENV_LINE_PATTERN = re.compile(
+    rb"^[ \t]*([^#=\s][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE
+)
+
 
 def parse_env_file(path: Path) -> dict[str, str]:
     """Parse an env file into a dictionary."""
-    out: dict[str, str] = {}
-    if not path.exists():
-        return out
-    for line in path.read_text().splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" in line:
-            key, _, value = line.partition("=")
-            out[key.strip()] = value.strip()
-    return out
+    # Env files are small: read them in one unbuffered call rather than stat-ing
+    # first and then going through a buffered reader.
+    try:
+        with path.open("rb", buffering=0) as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    # Work on raw bytes and only decode the key/value pairs we keep.
+    return {
+        m.group(1).decode("utf-8"): m.group(2).decode("utf-8")
+        for m in ENV_LINE_PATTERN.finditer(data)
+    }
 
 
 def main() -> None:
@@ -37,10 +46,18 @@ def main() -> None:
         merged.update(parse_env_file(p))
 
     out_path = root / ".env.debug"
-    out_path.write_text(
-        "\n".join(f"{k}={v}" for k, v in merged.items()) + "\n",
-        encoding="utf-8",
+    # Write to a temp file in the same directory and atomically swap it in, so
+    # concurrent debugger launches never observe a partially written file.
+    fd, tmp_name = tempfile.mkstemp(
+        dir=out_path.parent, prefix=f"{out_path.name}.", suffix=".tmp"
     )
+    try:
+        with open(fd, "w", encoding="utf-8", buffering=1 << 16) as f:
+            f.writelines(f"{k}={v}\n" for k, v in merged.items())
+        os.replace(tmp_name, out_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
     print(f"Wrote {len(merged)} vars to {out_path}")
 
 
@@ -13,16 +13,15 @@ from pathlib import Path
 JWT_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+=*$")
 
 HATCHET_KEY = "HATCHET_CLIENT_TOKEN"
+# Matches an assignment to HATCHET_KEY, with or without spaces around "="
+KEY_RE = re.compile(rf"^{re.escape(HATCHET_KEY)}\s*=")
 ENV_FILES = (".env.local.hatchet", ".env.local.host.hatchet")
 
 
 def extract_token(lines: list[str]) -> str | None:
     """Return the first line that looks like a JWT, or None."""
-    for line in lines:
-        s = line.strip()
-        if s and JWT_PATTERN.fullmatch(s):
-            return s
-    return None
+    stripped = (line.strip() for line in lines)
+    return next(filter(JWT_PATTERN.fullmatch, stripped), None)
 
 
 def update_env_file(path: Path, token: str) -> None:
@@ -30,12 +29,10 @@ def update_env_file(path: Path, token: str) -> None:
     lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
 
     new_lines: list[str] = []
-    key_prefix = f"{HATCHET_KEY}="
     replaced = False
 
     for line in lines:
-        stripped = line.strip()
-        if stripped.startswith(key_prefix) or stripped.startswith(f"{HATCHET_KEY} ="):
+        if KEY_RE.match(line.lstrip()):
             # Replace this line with the new token (preserve style: key=value)
             new_lines.append(f"{HATCHET_KEY}={token}")
             replaced = True
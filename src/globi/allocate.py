@@ -5,7 +5,6 @@ import logging
 import math
 from pathlib import Path
 
-import boto3
 import geopandas as gpd
 import numpy as np
 import yaml
@@ -20,11 +19,13 @@ from tqdm import tqdm
 from globi.models.configs import GloBIExperimentSpec
 from globi.models.tasks import GloBIBuildingSpec
 from globi.pipelines import preprocess_gis_file, simulate_globi_building
+from globi.s3_utils import default_s3_client
+from globi.yaml_utils import load_yaml_file
 
 # TODO: TEST THIS!!
 
 
-s3_client = boto3.client("s3")
+s3_client = default_s3_client()
 
 logger = logging.getLogger(__name__)
 
@@ -131,8 +132,9 @@ def allocate_globi_dryrun(
         msg = "EPWZip file is required for dry run"
         raise ValueError(msg)
 
-    with open(config.file_config.semantic_fields_file) as f:
-        model = SemanticModelFields.model_validate(yaml.safe_load(f))
+    model = SemanticModelFields.model_validate(
+        load_yaml_file(config.file_config.semantic_fields_file)
+    )
 
     grid, field_vals = model.make_grid(numerical_discretization=10)
     grid = grid.sample(min(max_tests or len(grid), len(grid)))
@@ -243,5 +245,11 @@ if __name__ == "__main__":
             "MediumDensity", "MedDensity"
         )
         old_gdf.to_file(new_gdf_path, driver="GeoJSON")
-        spec.file_config.gis_file = new_gdf_path
+        spec = spec.model_copy(
+            update={
+                "file_config": spec.file_config.model_copy(
+                    update={"gis_file": new_gdf_path}
+                )
+            }
+        )
         allocate_globi_experiment(spec)
@@ -1,31 +1,42 @@
 """Base models for the GloBI project."""
 
 import tempfile
+from functools import cache
 from pathlib import Path
 from typing import Self
 
-import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from scythe.utils.filesys import FileReference, fetch_uri
 
+from globi.yaml_utils import load_yaml_file
+
+_REMOTE_SCHEMES = ("http://", "https://", "s3://")
+
 
 class BaseConfig(BaseModel):
     """A base configuration for a Globi experiment."""
 
+    # Configs are shared by reference across every building spec in an experiment,
+    # so they are immutable; use `model_copy(update=...)` to derive a modified one.
+    model_config = ConfigDict(frozen=True)
+
+    @classmethod
+    @cache
+    def _adapter(cls) -> TypeAdapter[Self]:
+        """Return the (cached) type adapter used to validate this config class."""
+        return TypeAdapter(cls)
+
     @classmethod
     def from_manifest(cls, manifest_path: Path) -> Self:
         """Load the base configuration from a manifest file."""
-        with open(manifest_path) as f:
-            manifest = yaml.safe_load(f)
-        return cls.model_validate(manifest)
+        manifest = load_yaml_file(manifest_path)
+        return cls._adapter().validate_python(manifest)
 
     @classmethod
     def from_manifest_fileref(cls, manifest_fileref: FileReference) -> Self:
         """Load the base configuration from a manifest file reference."""
-        if isinstance(manifest_fileref, str) and (
-            not manifest_fileref.startswith("http://")
-            and not manifest_fileref.startswith("https://")
-            and not manifest_fileref.startswith("s3://")
+        if isinstance(manifest_fileref, str) and not manifest_fileref.startswith(
+            _REMOTE_SCHEMES
         ):
             manifest_fileref = Path(manifest_fileref)
         if isinstance(manifest_fileref, Path):
@@ -39,6 +50,12 @@ class BaseConfig(BaseModel):
     @classmethod
     def from_(cls, v: Self | FileReference) -> Self:
         """Load the base configuration from a manifest file reference or a local path."""
-        if isinstance(v, BaseConfig | dict):
+        if isinstance(v, _PASSTHROUGH_TYPES):
             return v
+        if isinstance(v, Path):
+            return cls.from_manifest(v)
         return cls.from_manifest_fileref(v)
+
+
+# Values that `BaseConfig.from_` hands straight on to pydantic validation.
+_PASSTHROUGH_TYPES = (BaseConfig, dict)
@@ -2,13 +2,15 @@
 
 import io
 import logging
+import math
+import os
 import sys
-from functools import cached_property
+from datetime import datetime
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Literal, cast
+from typing import Any, Literal, Self, cast
 
 import numpy as np
-import yaml
 from epinterface.geometry import compute_shading_mask
 from epinterface.sbem.components.composer import (
     construct_composer_model,
@@ -26,9 +28,97 @@ from globi.type_utils import (
     ConditionedOptions,
     OccupiedOptions,
 )
+from globi.yaml_utils import load_yaml_file
 
 logger = logging.getLogger(__name__)
 
+# Indexed by a bool to render the yes/no extra-space features.
+_YES_NO = ("No", "Yes")
+
+_N_SHADING_BINS = 48
+_SHADING_MASK_KEYS = tuple(
+    f"feature.geometry.shading_mask_{i:02d}" for i in range(_N_SHADING_BINS)
+)
+# compute_shading_mask yields a zero elevation angle for every ray without neighbors.
+_UNSHADED_MASK = (0.0,) * _N_SHADING_BINS
+
+
+@lru_cache(maxsize=4096)
+def _shading_mask(
+    rotated_rectangle: str,
+    neighbor_polys: tuple[str, ...],
+    neighbor_heights: tuple[float | int | None, ...],
+) -> tuple[float, ...]:
+    """Compute the shading mask for a footprint, memoized on its geometry."""
+    shading_mask = compute_shading_mask(
+        rotated_rectangle,
+        neighbors=list(neighbor_polys),
+        neighbor_heights=list(neighbor_heights),
+        azimuthal_angle=2 * np.pi / _N_SHADING_BINS,
+    )
+    return tuple(shading_mask.tolist())
+
+
+@lru_cache(maxsize=1)
+def _zone_selector_model():
+    """Build the composer model used to select zone components.
+
+    It only depends on the ZoneComponent class, so it is built once per process.
+    """
+    g = construct_graph(ZoneComponent)
+    return construct_composer_model(
+        g,
+        ZoneComponent,
+        use_children=False,
+    )
+
+
+@lru_cache(maxsize=64)
+def _zone_selector(component_map: Path, mtime_ns: int):
+    """Load and validate a component map, memoized on its path and modification time."""
+    component_map_yaml = load_yaml_file(component_map)
+    return _zone_selector_model().model_validate(component_map_yaml)
+
+
+def _stdout_has_fileno() -> bool:
+    """True if sys.stdout has a real OS file descriptor (required by Prisma on Windows in Jupyter)."""
+    try:
+        sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
+        return False
+    else:
+        return True
+
+
+@lru_cache(maxsize=1)
+def _devnull() -> io.TextIOWrapper:
+    """Open os.devnull once and keep it open for the lifetime of the process."""
+    return open(os.devnull, "w")
+
+
+@lru_cache(maxsize=8)
+def _prisma_settings(database_path: Path, mtime_ns: int | None) -> PrismaSettings:
+    """Run the Prisma setup check for a database, memoized on its path and modification time.
+
+    `PrismaSettings.db` caches its client, so the memoized settings must not hand
+    out clients; use `_prisma_client` instead.
+    """
+    return PrismaSettings.New(
+        database_path=database_path, if_exists="ignore", auto_register=False
+    )
+
+
+def _prisma_client(database_path: Path, mtime_ns: int | None):
+    """Create a new Prisma client for a database, running its setup check only once.
+
+    Workers simulate buildings concurrently and each call connects and disconnects
+    its client, so clients are never shared between calls.
+    """
+    settings = _prisma_settings(database_path, mtime_ns)
+    return PrismaSettings(
+        database_path=settings.database_path, auto_register=settings.auto_register
+    ).db
+
 
 class MinimalBuildingSpec(BaseModel):
     """A spec for running an EnergyPlus simulation for any region."""
@@ -82,21 +172,36 @@ class MinimalBuildingSpec(BaseModel):
     exposed_basement_frac: float = Field(
         default=0.25,
         description="The fraction of the basement that is exposed to the air.",
-        ge=0,
-        le=1,
+        gt=0,
+        lt=1,
     )
 
-    @model_validator(mode="after")
-    def order_length_width(self):
+    @model_validator(mode="before")
+    @classmethod
+    def order_length_width(cls, data: Any) -> Any:
         """Order the length and width of the building."""
-        if self.length < self.width:
-            self.length, self.width = self.width, self.length
-        return self
+        # Swapping the raw input avoids assigning to the validated model afterwards.
+        if not isinstance(data, dict):
+            return data
+        length = data.get("length", cls.model_fields["length"].default)
+        width = data.get("width", cls.model_fields["width"].default)
+        try:
+            should_swap = float(length) < float(width)
+        except (TypeError, ValueError):
+            # leave invalid values for the field validation to report
+            return data
+        if should_swap:
+            return {**data, "length": width, "width": length}
+        return data
 
     @property
     def globi_spec(self) -> "GloBIBuildingSpec":
         """Convert the MinimalBuildingSpec to a GloBIBuildingSpec."""
-        return GloBIBuildingSpec(
+        length, width = self.length, self.width
+        # Every field copied from this spec has the same type as on GloBIBuildingSpec
+        # and bounds at least as strict, and the derived geometry is valid by
+        # construction, so pydantic validation is skipped. Keep the bounds in sync.
+        return GloBIBuildingSpec.model_construct(
             building_id="placeholder",
             db_file=self.db_file,
             semantic_fields_file=self.semantic_fields_file,
@@ -106,11 +211,11 @@ class MinimalBuildingSpec(BaseModel):
             neighbor_polys=[],
             neighbor_heights=[],
             neighbor_floors=[],
-            rotated_rectangle=f"Polygon ((0 0, {self.length} 0, {self.length} {self.width}, 0 {self.width}, 0 0))",
-            long_edge_angle=0,
-            long_edge=self.length,
-            short_edge=self.width,
-            aspect_ratio=self.length / self.width,
+            rotated_rectangle=f"Polygon ((0 0, {length} 0, {length} {width}, 0 {width}, 0 0))",
+            long_edge_angle=0.0,
+            long_edge=length,
+            short_edge=width,
+            aspect_ratio=length / width,
             wwr=self.wwr,
             num_floors=self.num_floors,
             f2f_height=self.f2f_height,
@@ -118,7 +223,7 @@ class MinimalBuildingSpec(BaseModel):
             basement=self.basement,
             attic=self.attic,
             exposed_basement_frac=self.exposed_basement_frac,
-            rotated_rectangle_area_ratio=1,
+            rotated_rectangle_area_ratio=1.0,
             experiment_id="MinimalBuildingSpec",
             sort_index=0,
         )
@@ -198,15 +303,40 @@ class GloBIBuildingSpec(ExperimentInputSpec):
         description="The parent experiment spec.",
     )
 
-    @property
+    @classmethod
+    def from_trusted_dict(cls, data: dict[str, Any]) -> Self:
+        """Build a spec from already-validated data without running pydantic validation.
+
+        The values must already have their field types (e.g. as produced by another
+        spec or a previous validation); nothing is coerced or checked.
+        """
+        return cls.model_construct(**data)
+
+    @cached_property
     def feature_dict(self) -> dict[str, str | int | float]:
         """Return a dictionary of features which will be available to ML algos."""
-        features: dict[str, str | int | float] = {
+        # TODO: consider passing in
+        # neighbors directly to Model.geometry, letting model perform neighbor
+        # insertion directly rather than via a callback,
+        # and then let shading mask become a computed property of the model.geometry.
+        shading_mask = (
+            _shading_mask(
+                self.rotated_rectangle,
+                tuple(self.neighbor_polys),
+                tuple(self.neighbor_heights),
+            )
+            if self.neighbor_polys
+            else _UNSHADED_MASK
+        )
+
+        # Built as a single literal so the dict is sized once rather than grown
+        # through repeated updates.
+        return {
             "feature.geometry.long_edge": self.long_edge,
             "feature.geometry.short_edge": self.short_edge,
             "feature.geometry.orientation": self.long_edge_angle,
-            "feature.geometry.orientation.cos": np.cos(self.long_edge_angle),
-            "feature.geometry.orientation.sin": np.sin(self.long_edge_angle),
+            "feature.geometry.orientation.cos": math.cos(self.long_edge_angle),
+            "feature.geometry.orientation.sin": math.sin(self.long_edge_angle),
             "feature.geometry.aspect_ratio": self.aspect_ratio,
             "feature.geometry.wwr": self.wwr,
             "feature.geometry.num_floors": self.num_floors,
@@ -217,62 +347,34 @@ class GloBIBuildingSpec(ExperimentInputSpec):
             "feature.geometry.energy_model_occupied_area": self.energy_model_occupied_area,
             "feature.geometry.attic_height": self.attic_height or 0,
             "feature.geometry.exposed_basement_frac": self.exposed_basement_frac,
+            **dict(zip(_SHADING_MASK_KEYS, shading_mask, strict=True)),
+            # semantic features are kept separately as one building may have
+            # multiple simulations with different semantic fields.
+            **{
+                f"feature.semantic.{feature_name}": feature_value
+                for feature_name, feature_value in self.semantic_field_context.items()
+            },
+            "feature.weather.file": self.epwzip_path.stem,
+            # conditional features are derived from the static and semantic features,
+            # and may be subject to things like conditional sampling, estimation etc.
+            # e.g. rvalues, uvalues, schedule, etc.
+            # additional things like basement/attic config?
+            "feature.extra_spaces.basement.exists": _YES_NO[self.has_basement],
+            "feature.extra_spaces.basement.occupied": _YES_NO[
+                self.basement_is_occupied
+            ],
+            "feature.extra_spaces.basement.conditioned": _YES_NO[
+                self.basement_is_conditioned
+            ],
+            "feature.extra_spaces.basement.use_fraction": self.basement_use_fraction,
+            "feature.extra_spaces.attic.exists": _YES_NO[self.has_attic],
+            "feature.extra_spaces.attic.occupied": _YES_NO[self.attic_is_occupied],
+            "feature.extra_spaces.attic.conditioned": _YES_NO[
+                self.attic_is_conditioned
+            ],
+            "feature.extra_spaces.attic.use_fraction": self.attic_use_fraction,
         }
 
-        # TODO: consider passing in
-        # neighbors directly to Model.geometry, letting model perform neighbor
-        # insertion directly rather than via a callback,
-        # and then let shading mask become a computed property of the model.geometry.
-        shading_mask = compute_shading_mask(
-            self.rotated_rectangle,
-            neighbors=self.neighbor_polys,
-            neighbor_heights=self.neighbor_heights,
-            azimuthal_angle=2 * np.pi / 48,
-        )
-        shading_mask_values = {
-            f"feature.geometry.shading_mask_{i:02d}": val
-            for i, val in enumerate(shading_mask.tolist())
-        }
-        features.update(shading_mask_values)
-
-        # semantic features are kept separately as one building may have
-        # multiple simulations with different semantic fields.
-        features.update({
-            f"feature.semantic.{feature_name}": feature_value
-            for feature_name, feature_value in self.semantic_field_context.items()
-        })
-
-        features["feature.weather.file"] = self.epwzip_path.stem
-
-        # conditional features are derived from the static and semantic features,
-        # and may be subject to things like conditional sampling, estimation etc.
-        # e.g. rvalues, uvalues, schedule, etc.
-        # additional things like basement/attic config?
-        features["feature.extra_spaces.basement.exists"] = (
-            "Yes" if self.has_basement else "No"
-        )
-        features["feature.extra_spaces.basement.occupied"] = (
-            "Yes" if self.basement_is_occupied else "No"
-        )
-        features["feature.extra_spaces.basement.conditioned"] = (
-            "Yes" if self.basement_is_conditioned else "No"
-        )
-        features["feature.extra_spaces.basement.use_fraction"] = (
-            self.basement_use_fraction
-        )
-        features["feature.extra_spaces.attic.exists"] = (
-            "Yes" if self.has_attic else "No"
-        )
-        features["feature.extra_spaces.attic.occupied"] = (
-            "Yes" if self.attic_is_occupied else "No"
-        )
-        features["feature.extra_spaces.attic.conditioned"] = (
-            "Yes" if self.attic_is_conditioned else "No"
-        )
-        features["feature.extra_spaces.attic.use_fraction"] = self.attic_use_fraction
-
-        return features
-
     # TODO: use the scythe automatic referencing for these paths - FileReference class from scythe.utils.files
     # choose a local file and direclty use the 'Path' for this
     # self scythe - fetch uri
@@ -314,7 +416,7 @@ class GloBIBuildingSpec(ExperimentInputSpec):
             return self.epwzip_file
         return self.fetch_uri(self.epwzip_file)
 
-    @property
+    @cached_property
     def component_map(self) -> Path:
         """Fetch the component map file and return the local path.
 
@@ -332,66 +434,43 @@ class GloBIBuildingSpec(ExperimentInputSpec):
             zone_def (ZoneComponent): The zone definition for the simulation
         """
         # TODO: This whole method should move into epinterface with exped parameters like component map file path?
-        g = construct_graph(ZoneComponent)
-        SelectorModel = construct_composer_model(
-            g,
-            ZoneComponent,
-            use_children=False,
-        )
-
-        with open(self.component_map) as f:
-            component_map_yaml = yaml.safe_load(f)
-        selector = SelectorModel.model_validate(component_map_yaml)
+        component_map = self.component_map
+        selector = _zone_selector(component_map, component_map.stat().st_mtime_ns)
 
         # Log the database path being used for debugging
-        import os
-        from datetime import datetime
-
-        if self.db_path.exists():
-            mtime = os.path.getmtime(self.db_path)
-            mtime_str = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+        db_stat = self.db_path.stat() if self.db_path.exists() else None
+        if db_stat is None:
+            logger.error(f"Database file not found: {self.db_path}")
+        elif logger.isEnabledFor(logging.INFO):
+            mtime_str = datetime.fromtimestamp(db_stat.st_mtime).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
             logger.info(
                 f"Loading database: {self.db_path} "
-                f"(modified: {mtime_str}, size: {self.db_path.stat().st_size} bytes)"
+                f"(modified: {mtime_str}, size: {db_stat.st_size} bytes)"
             )
-        else:
-            logger.error(f"Database file not found: {self.db_path}")
 
-        # Force a fresh database connection by creating a new PrismaSettings instance
-        # This ensures we always reload the database, avoiding any caching issues.
-        # Each call to construct_zone_def() creates a new PrismaSettings instance,
-        # which should force SQLite to open a fresh connection and see any file updates.
-        settings = PrismaSettings.New(
-            database_path=self.db_path, if_exists="ignore", auto_register=False
+        # The setup check is skipped until the database file is modified; the
+        # client is new on every call, so concurrent calls never share a connection.
+        db = _prisma_client(
+            self.db_path, db_stat.st_mtime_ns if db_stat is not None else None
         )
-        db = settings.db
 
         context = self.semantic_field_context
 
-        def _stdout_has_fileno() -> bool:
-            """True if sys.stdout has a real OS file descriptor (required by Prisma on Windows in Jupyter)."""
-            try:
-                sys.stdout.fileno()
-            except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
-                return False
-            else:
-                return True
-
         if not _stdout_has_fileno():
             # Prisma spawns a subprocess; on Windows it needs sys.stdout/stderr to have .fileno().
             # Jupyter's OutStream doesn't support fileno(), so temporarily use devnull for the pipeline call.
-            with open(os.devnull, "w") as _devnull:
-                _old_stdout, _old_stderr = sys.stdout, sys.stderr
-                sys.stdout = sys.stderr = _devnull
-                try:
-                    with db:
-                        zone = cast(
-                            ZoneComponent,
-                            selector.get_component(context=context, db=db),
-                        )
-                finally:
-                    sys.stdout, sys.stderr = _old_stdout, _old_stderr
-                    _devnull.close()
+            _old_stdout, _old_stderr = sys.stdout, sys.stderr
+            sys.stdout = sys.stderr = _devnull()
+            try:
+                with db:
+                    zone = cast(
+                        ZoneComponent,
+                        selector.get_component(context=context, db=db),
+                    )
+            finally:
+                sys.stdout, sys.stderr = _old_stdout, _old_stderr
         else:
             # Use context manager to ensure connection is properly closed after use.
             # This ensures SQLite releases file locks and any future reads will see
@@ -465,29 +544,27 @@ class GloBIBuildingSpec(ExperimentInputSpec):
         min_unoccupied_and_unconditioned_rise_over_run = 4 / 12
         max_unoccupied_and_unconditioned_rise_over_run = 6 / 12
 
+        if self.attic_is_occupied or self.attic_is_conditioned:
+            min_rise_over_run = min_occupied_or_conditioned_rise_over_run
+            max_rise_over_run = max_occupied_or_conditioned_rise_over_run
+        else:
+            min_rise_over_run = min_unoccupied_and_unconditioned_rise_over_run
+            max_rise_over_run = max_unoccupied_and_unconditioned_rise_over_run
+
         run = self.short_edge / 2
-        attic_height = None
         attempts = 20
-        while attic_height is None and attempts > 0:
-            if self.attic_is_occupied or self.attic_is_conditioned:
-                attic_height = run * np.random.uniform(
-                    min_occupied_or_conditioned_rise_over_run,
-                    max_occupied_or_conditioned_rise_over_run,
-                )
-            else:
-                attic_height = run * np.random.uniform(
-                    min_unoccupied_and_unconditioned_rise_over_run,
-                    max_unoccupied_and_unconditioned_rise_over_run,
-                )
-            if attic_height > self.f2f_height * 2.5:
-                attic_height = None
-            attempts -= 1
-        if attic_height is None:
+        # Draw every attempt at once and keep the first one that fits. This is one
+        # small NumPy call per spec, so a compiled sampling loop would not pay off.
+        attic_heights = run * np.random.uniform(
+            min_rise_over_run, max_rise_over_run, size=attempts
+        )
+        valid = attic_heights <= self.f2f_height * 2.5
+        if not valid.any():
             msg = "Failed to sample valid attic height (must be less than 2.5x f2f height)."
             raise ValueError(msg)
-        return attic_height
+        return float(attic_heights[valid.argmax()])
 
-    @property
+    @cached_property
     def n_conditioned_floors(self) -> int:
         """The number of conditioned floors in the building."""
         n_floors = self.num_floors
@@ -497,7 +574,7 @@ class GloBIBuildingSpec(ExperimentInputSpec):
             n_floors += 1
         return n_floors
 
-    @property
+    @cached_property
     def n_occupied_floors(self) -> int:
         """The number of occupied floors in the building."""
         n_floors = self.num_floors
@@ -507,17 +584,17 @@ class GloBIBuildingSpec(ExperimentInputSpec):
             n_floors += 1
         return n_floors
 
-    @property
+    @cached_property
     def energy_model_footprint_area(self) -> float:
         """The floor area of the building."""
         return self.long_edge * self.short_edge
 
-    @property
+    @cached_property
     def energy_model_conditioned_area(self) -> float:
         """The conditioned area of the building."""
         return self.n_conditioned_floors * self.energy_model_footprint_area
 
-    @property
+    @cached_property
     def energy_model_occupied_area(self) -> float:
         """The conditioned area of the building."""
         return self.n_occupied_floors * self.energy_model_footprint_area
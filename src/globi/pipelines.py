@@ -52,6 +52,7 @@ from globi.models.configs import (
     GISPreprocessorColumnMap,
 )
 from globi.models.tasks import GloBIBuildingSpec, GloBIOutputSpec
+from globi.yaml_utils import load_yaml_file
 
 logger = logging.getLogger(__name__)
 
@@ -262,7 +263,13 @@ def simulate_globi_building_pipeline(
             dfs["HourlyData"] = hourly_df
         if spec.parent_experiment_spec.hourly_data_config.does_file_output:
             hourly_data_outpath = tempdir / "outputs_hourly_data.pq"
-            hourly_df.to_parquet(hourly_data_outpath)
+            hourly_df.to_parquet(
+                hourly_data_outpath,
+                engine="pyarrow",
+                compression="zstd",
+                compression_level=3,
+                use_dictionary=True,
+            )
 
     return GloBIOutputSpec(
         dataframes=dfs,
@@ -320,8 +327,9 @@ def preprocess_gis_file(
     # contain standard provided values, like wwr, height etc etc.
     # it also stores the fields that will be used for semantic mapping,
     # so we can run a consistency check with the component map.
-    with open(file_config.semantic_fields_file) as f:
-        semantic_fields = SemanticModelFields.model_validate(yaml.safe_load(f))
+    semantic_fields = SemanticModelFields.model_validate(
+        load_yaml_file(file_config.semantic_fields_file)
+    )
     if semantic_fields.Building_ID_col is None:
         raise SemanticFieldsFileHasNoBuildingIDColumnError()
 
@@ -543,7 +551,7 @@ def preprocess_gis_file(
         logger.info(f"saving preprocessed gis file to: {output_path}")
         gdf_output_path = output_path / "globi_gdf.pq"
         column_output_map_output_path = output_path / "globi_column_output_map.yaml"
-        gdf.to_parquet(gdf_output_path)
+        gdf.to_parquet(gdf_output_path, compression="zstd", compression_level=3)
         with open(column_output_map_output_path, "w") as f:
             yaml.dump(
                 column_output_map.model_dump(mode="json"), f, sort_keys=False, indent=2
@@ -620,8 +628,9 @@ if __name__ == "__main__":
     from globi.models.tasks import MinimalBuildingSpec
 
     with tempfile.TemporaryDirectory() as tempdir:
-        with open("inputs/building.yml") as f:
-            input_spec = MinimalBuildingSpec.model_validate(yaml.safe_load(f))
+        input_spec = MinimalBuildingSpec.model_validate(
+            load_yaml_file("inputs/building.yml")
+        )
         o = simulate_globi_building_pipeline(
             input_spec=input_spec.globi_spec,
             tempdir=Path(tempdir),
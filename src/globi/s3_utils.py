@@ -0,0 +1,19 @@
+"""S3 helpers for the GloBI project."""
+
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3 import S3Client
+
+
+@cache
+def default_s3_client() -> "S3Client":
+    """Return a process-wide S3 client.
+
+    boto3 clients are thread-safe and expensive to build (credential resolution,
+    endpoint and service model loading), so they are shared rather than recreated.
+    """
+    import boto3
+
+    return boto3.client("s3")
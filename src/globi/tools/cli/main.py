@@ -1,18 +1,152 @@
 """GloBI CLI."""
 
-import tempfile
+import io
+import json
+import os
+import time
 from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
-import boto3
 import click
-import yaml
 
 if TYPE_CHECKING:
+    import pandas as pd
     from mypy_boto3_s3 import S3Client
+    from scythe.experiments import BaseExperiment, SemVer
 else:
     S3Client = object
 
+OUTPUT_FORMATS = ("parquet", "csv", "xlsx")
+# The dataframes with a csv/xlsx export; every other one is only saved as parquet.
+TABULAR_EXPORT_KEYS = ("EnergyAndPeak", "Results")
+
+# Resolving the latest version lists every version prefix of a run in S3, so the
+# answer is kept on disk for a while; --refresh skips it.
+LATEST_VERSION_CACHE_TTL_SECONDS = 15 * 60
+
+
+def _latest_version_cache_path() -> Path:
+    """The file holding recently resolved latest versions, under the user cache dir."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "globi" / "latest_versions.json"
+
+
+def _resolve_latest_version(
+    exp: "BaseExperiment",
+    bucket: str,
+    s3_client: S3Client,
+    refresh: bool = False,
+) -> "SemVer":
+    """Resolve the latest version of a run, reusing a lookup younger than the TTL."""
+    from scythe.experiments import SemVer
+
+    cache_path = _latest_version_cache_path()
+    key = f"{bucket}/{exp.run_name}"
+    try:
+        cache = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        cache = {}
+
+    entry = cache.get(key)
+    if (
+        not refresh
+        and entry is not None
+        and time.time() - entry["resolved_at"] < LATEST_VERSION_CACHE_TTL_SECONDS
+    ):
+        return SemVer.FromString(entry["version"])
+
+    exp_version = exp.latest_version(s3_client, from_cache=False)
+    if exp_version is None:
+        msg = f"No version found for experiment {exp.run_name}"
+        raise ValueError(msg)
+    cache[key] = {"version": str(exp_version.version), "resolved_at": time.time()}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(cache))
+    return exp_version.version
+
+
+def _write_csv(df: "pd.DataFrame", path: Path) -> None:
+    """Write a dataframe to csv, using pyarrow's vectorized writer for numeric frames.
+
+    pyarrow renders strings, bools and some floats differently from pandas
+    (quoted strings, `1` for `1.0`), so it is only used when the index and every
+    column are numeric, where the values read back the same. The header rows are
+    still rendered by pandas so that MultiIndex columns keep the same layout as
+    `DataFrame.to_csv`.
+    """
+    body = df.reset_index()
+    if not all(dtype.kind in "iuf" for dtype in body.dtypes):
+        df.to_csv(path)
+        return
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df.to_csv(path)
+        return
+
+    # Converting from pandas turns NaN into nulls, written empty like pandas does.
+    table = pa.Table.from_arrays(
+        [pa.array(body.iloc[:, i]) for i in range(body.shape[1])],
+        names=[str(i) for i in range(body.shape[1])],
+    )
+    with open(path, "wb") as f:
+        f.write(df.iloc[:0].to_csv().encode("utf-8"))
+        pacsv.write_csv(
+            table, f, write_options=pacsv.WriteOptions(include_header=False)
+        )
+
+
+def _write_simulation_result(
+    key: str,
+    df: "pd.DataFrame",
+    rodir: Path,
+    formats: tuple[str, ...],
+    csv_layout: str,
+) -> None:
+    """Write a single simulation result dataframe in the requested formats."""
+    import pandas as pd
+
+    if "parquet" in formats:
+        df.to_parquet(
+            rodir / f"{key}.parquet",
+            engine="pyarrow",
+            compression="zstd",
+            compression_level=3,
+            use_dictionary=True,
+        )
+    # TODO: add excel outputs for overheating dataframes.
+    if key not in TABULAR_EXPORT_KEYS:
+        return
+
+    long_csv = "csv" in formats and csv_layout == "long"
+    if "csv" in formats and not long_csv:
+        _write_csv(df, rodir / f"{key}.csv")
+    if not long_csv and "xlsx" not in formats:
+        return
+
+    # Stack the months into rows once and reuse for both csv and excel.
+    stacked = cast(
+        pd.DataFrame,
+        df.reset_index(drop=True)
+        .stack(level="Month", future_stack=True)
+        .reset_index(level=0, drop=True),
+    )
+    if long_csv:
+        _write_csv(stacked, rodir / f"{key}.csv")
+    if "xlsx" not in formats:
+        return
+    with pd.ExcelWriter(rodir / f"{key}.xlsx", engine="xlsxwriter") as writer:
+        # Sheets are written sequentially on purpose: xlsxwriter holds the GIL
+        # while serializing, so worker threads would not overlap, and merging
+        # per-sheet workbooks would re-serialize every cell.
+        sheet_keys = stacked.columns.droplevel("Meter").unique()
+        for measurement, aggregation in sheet_keys:
+            label = f"{str(measurement).replace(' ', '')}_{str(aggregation).replace(' ', '')}"
+            cast(pd.DataFrame, stacked.loc[:, (measurement, aggregation)]).to_excel(
+                writer, sheet_name=label
+            )
+
 
 @click.group()
 def cli():
@@ -78,19 +212,25 @@ def manifest(
 
     from globi.allocate import allocate_globi_dryrun, allocate_globi_experiment
     from globi.models.configs import GloBIExperimentSpec
+    from globi.yaml_utils import load_yaml_file
 
     logging.basicConfig(level=logging.INFO)
 
-    with open(path) as f:
-        manifest = yaml.safe_load(f)
+    manifest = load_yaml_file(path)
 
     config = GloBIExperimentSpec.model_validate(manifest)
 
     if scenario:
-        config.scenario = scenario
+        config = config.model_copy(update={"scenario": scenario})
 
     if epwzip_file:
-        config.file_config.epwzip_file = epwzip_file
+        config = config.model_copy(
+            update={
+                "file_config": config.file_config.model_copy(
+                    update={"epwzip_file": epwzip_file}
+                )
+            }
+        )
 
     if grid_run:
         allocate_globi_dryrun(config, max_tests=max_sims)
@@ -119,15 +259,36 @@ def manifest(
     default=Path("outputs"),
     # prompt="Output directory path (optional)",
 )
+@click.option(
+    "--format",
+    "-f",
+    "formats",
+    multiple=True,
+    type=click.Choice(OUTPUT_FORMATS),
+    default=("parquet",),
+    show_default=True,
+    help="The result file formats to write; may be repeated. csv and xlsx are only written for the EnergyAndPeak and Results dataframes.",
+)
+@click.option(
+    "--csv-layout",
+    type=click.Choice(["wide", "long"]),
+    default="wide",
+    show_default=True,
+    help="Write the csv with one column per month (wide) or one row per month (long).",
+)
 def simulate(
     config: Path | str = Path("inputs/building.yml"),
     output_dir: Path | None = Path("outputs"),
+    formats: tuple[str, ...] = ("parquet",),
+    csv_layout: str = "wide",
 ):
     """Simulate a GloBI building."""
-    import pandas as pd
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
 
     from globi.models.tasks import MinimalBuildingSpec
     from globi.pipelines import simulate_globi_building_pipeline
+    from globi.yaml_utils import load_yaml_file
 
     if isinstance(config, str):
         config = Path(config)
@@ -135,8 +296,7 @@ def simulate(
     if not config.exists():
         msg = f"Config file {config} does not exist.  Either create it or use the --config option to specify a different path."
         raise FileNotFoundError(msg)
-    with open(config) as f:
-        manifest = yaml.safe_load(f)
+    manifest = load_yaml_file(config)
     conf = MinimalBuildingSpec.model_validate(manifest).globi_spec
 
     if output_dir is None:
@@ -149,24 +309,25 @@ def simulate(
         rodir = odir / "results"
         rodir.mkdir(parents=True, exist_ok=True)
         r = simulate_globi_building_pipeline(conf, epodir)
-        for k, v in r.dataframes.items():
-            v.to_parquet(rodir / f"{k}.parquet")
-            # TODO: add excel outputs for overheating dataframes.
-            if k == "EnergyAndPeak" or k == "Results":
-                v.reset_index(drop=True).stack(
-                    level="Month", future_stack=True
-                ).reset_index(level=0, drop=True).to_csv(rodir / f"{k}.csv")
-                with pd.ExcelWriter(rodir / "EnergyAndPeak.xlsx") as writer:
-                    for measurement in v.columns.unique(level="Measurement"):
-                        df0 = cast(pd.DataFrame, v[measurement])
-                        for aggregation in df0.columns.unique(level="Aggregation"):
-                            df1 = cast(pd.DataFrame, df0[aggregation])
-                            label = f"{str(measurement).replace(' ', '')}_{str(aggregation).replace(' ', '')}"
-                            df1.reset_index(drop=True).stack(
-                                level="Month", future_stack=True
-                            ).reset_index(level=0, drop=True).to_excel(
-                                writer, sheet_name=label
-                            )
+        if "parquet" not in formats:
+            skipped = [k for k in r.dataframes if k not in TABULAR_EXPORT_KEYS]
+            if skipped:
+                click.echo(
+                    f"Warning: {', '.join(skipped)} only have parquet output and "
+                    "will not be saved; add --format parquet to keep them.",
+                    err=True,
+                )
+        # Each key writes its own files, and pyarrow releases the GIL while
+        # encoding parquet/csv, so the large hourly frame overlaps the rest.
+        with ThreadPoolExecutor(max_workers=min(4, len(r.dataframes))) as pool:
+            list(
+                pool.map(
+                    lambda kv: _write_simulation_result(
+                        kv[0], kv[1], rodir, formats, csv_layout
+                    ),
+                    r.dataframes.items(),
+                )
+            )
 
     # TODO: improve results summarization
     print("--------------------------------")
@@ -175,10 +336,9 @@ def simulate(
     end_uses = (
         r.dataframes["EnergyAndPeak"]
         .Energy["End Uses"]
-        .T.groupby(level=["Meter"])
+        .iloc[0]
+        .groupby(level="Meter")
         .sum()
-        .T.reset_index(drop=True)
-        .T[0]
         .rename("End Uses [kWh/m2]")
     )
     print(end_uses)
@@ -186,10 +346,9 @@ def simulate(
     print(
         r.dataframes["EnergyAndPeak"]
         .Peak["Utilities"]
-        .T.groupby(level=["Meter"])
+        .iloc[0]
+        .groupby(level="Meter")
         .sum()
-        .T.reset_index(drop=True)
-        .T[0]
         .rename("Peak Demand [kW/m2]")
     )
     print("--------------------------------")
@@ -220,7 +379,7 @@ def tests():
     "--poll-interval",
     type=int,
     default=10,
-    help="Seconds between status polls.",
+    help="Seconds between status polls when falling back to polling.",
 )
 @click.option(
     "--poll-timeout",
@@ -234,26 +393,28 @@ def e2e(
     poll_interval: int = 10,
     poll_timeout: int = 300,
 ):
-    """Run E2E experiment: allocate and poll for completion.
+    """Run E2E experiment: allocate and wait for completion.
 
     Intended for CI; run with: make cli-native test e2e
     """
+    import asyncio
     import logging
     import sys
-    import time
 
+    import grpc
+    from hatchet_sdk import FailedTaskRunExceptionGroup
     from hatchet_sdk.clients.rest.models.v1_task_status import V1TaskStatus
     from scythe.hatchet import hatchet
 
     from globi.allocate import allocate_globi_experiment
     from globi.models.configs import GloBIExperimentSpec
+    from globi.yaml_utils import load_yaml_file
 
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
     manifest_path = Path(manifest)
-    with open(manifest_path) as f:
-        manifest_data = yaml.safe_load(f)
+    manifest_data = load_yaml_file(manifest_path)
     config = GloBIExperimentSpec.model_validate(manifest_data)
 
     logger.info("Allocating experiment from %s (max_sims=%d)", manifest, max_sims)
@@ -266,7 +427,20 @@ def e2e(
     logger.info("Experiment allocated, workflow_run_id=%s", workflow_run_id)
 
     deadline = time.monotonic() + poll_timeout
-    while time.monotonic() < deadline:
+    # Block on hatchet's workflow-run subscription rather than polling the REST
+    # API. However the subscription ends, the loop below checks the status at
+    # least once, and keeps polling until the deadline if the run is unfinished.
+    try:
+        asyncio.run(asyncio.wait_for(ref.aio_result(), timeout=poll_timeout))
+    except TimeoutError:
+        logger.warning("No result after %d seconds; checking status.", poll_timeout)
+    except FailedTaskRunExceptionGroup:
+        logger.warning("Run reported failed tasks; checking status.")
+    except (ValueError, grpc.RpcError) as e:
+        # hatchet raises ValueError once it gives up reconnecting the listener.
+        logger.warning("Run subscription failed (%s); polling status.", e)
+
+    while True:
         status = hatchet.runs.get_status(workflow_run_id)
         logger.info("Status: %s", status)
 
@@ -279,7 +453,10 @@ def e2e(
             logger.error("Experiment %s", status.value)
             sys.exit(1)
 
-        time.sleep(poll_interval)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(poll_interval, remaining))
 
     logger.error("Experiment did not complete within %d seconds", poll_timeout)
     sys.exit(1)
@@ -319,10 +496,27 @@ def get():
     required=False,
     help="The path to the directory to use for the simulation.",
 )
+@click.option(
+    "--format",
+    "-f",
+    "formats",
+    multiple=True,
+    type=click.Choice(OUTPUT_FORMATS),
+    default=("parquet",),
+    show_default=True,
+    help="The file formats to save; may be repeated. xlsx is only written for the EnergyAndPeak and Results dataframes.",
+)
 @click.option(
     "--include-csv",
     is_flag=True,
-    help="Include the csv file in the output.",
+    help="Include the csv file in the output (same as --format csv).",
+    required=False,
+)
+@click.option(
+    "--refresh",
+    "-r",
+    is_flag=True,
+    help="Bypass the on-disk cache of recently resolved latest versions.",
     required=False,
 )
 def experiment(
@@ -330,25 +524,38 @@ def experiment(
     version: str | None = None,
     dataframe_key: str = "EnergyAndPeak",
     output_dir: str = "outputs",
+    formats: tuple[str, ...] = ("parquet",),
     include_csv: bool = False,
+    refresh: bool = False,
 ):
     """Get a GloBI experiment from a manifest file."""
+    # Checked before the heavy imports and any S3 calls.
+    write_csv = include_csv or "csv" in formats
+    write_xlsx = "xlsx" in formats and dataframe_key in TABULAR_EXPORT_KEYS
+    if "xlsx" in formats and not write_xlsx:
+        msg = (
+            f"xlsx output is only available for the {' and '.join(TABULAR_EXPORT_KEYS)} "
+            f"dataframes, not {dataframe_key}."
+        )
+        if "parquet" not in formats and not write_csv:
+            raise click.UsageError(msg)
+        click.echo(f"Warning: {msg} Skipping xlsx.", err=True)
+
     import pandas as pd
     from scythe.experiments import BaseExperiment, SemVer
     from scythe.settings import ScytheStorageSettings
 
     from globi.pipelines import simulate_globi_building
+    from globi.s3_utils import default_s3_client
 
-    s3_client: S3Client = boto3.client("s3")
+    s3_client: S3Client = default_s3_client()
     s3_settings = ScytheStorageSettings()
     exp = BaseExperiment(experiment=simulate_globi_building, run_name=run_name)
 
     if not version:
-        exp_version = exp.latest_version(s3_client, from_cache=False)
-        if exp_version is None:
-            msg = f"No version found for experiment {run_name}"
-            raise ValueError(msg)
-        sem_version = exp_version.version
+        sem_version = _resolve_latest_version(
+            exp, s3_settings.BUCKET, s3_client, refresh
+        )
     else:
         sem_version = SemVer.FromString(version)
 
@@ -362,39 +569,48 @@ def experiment(
 
     output_key.parent.mkdir(parents=True, exist_ok=True)
 
-    print(f"Downloading {results_filekeys[dataframe_key]} to {output_key.as_posix()}")
-    s3_client.download_file(
+    print(f"Downloading {results_filekeys[dataframe_key]}")
+    buf = io.BytesIO()
+    s3_client.download_fileobj(
         Bucket=s3_settings.BUCKET,
         Key=results_filekeys[dataframe_key],
-        Filename=output_key.as_posix(),
+        Fileobj=buf,
     )
-    print(f"Downloaded to {output_key.as_posix()}")
+    if "parquet" in formats:
+        output_key.write_bytes(buf.getbuffer())
+        print(f"Downloaded to {output_key.as_posix()}")
+
+    if not (write_csv or write_xlsx):
+        return
 
-    df = pd.read_parquet(output_key.as_posix())
-    if include_csv:
+    buf.seek(0)
+    df = pd.read_parquet(buf, engine="pyarrow")
+    if write_csv:
         print("Saving to csv...")
         df.reset_index(
             [c for c in df.index.names if c != "building_id"], drop=True
         ).to_csv(output_key.with_suffix(".csv").as_posix())
 
-    if dataframe_key == "EnergyAndPeak" or dataframe_key == "Results":
+    if write_xlsx:
         print("Saving to excel...")
         ixframe = df.index.to_frame(index=False)
-        with pd.ExcelWriter(output_key.with_suffix(".xlsx").as_posix()) as writer:
+        with pd.ExcelWriter(
+            output_key.with_suffix(".xlsx").as_posix(), engine="xlsxwriter"
+        ) as writer:
             cols_for_feature_index = [
                 c
                 for c in ixframe.columns
                 if c == "building_id" or "feature.semantic." in c
             ]
             ixframe[cols_for_feature_index].to_excel(writer, sheet_name="Feature Index")
-            for measurement in df.columns.unique(level="Measurement"):
-                df0 = cast(pd.DataFrame, df[measurement])
-                for aggregation in df0.columns.unique(level="Aggregation"):
-                    df1 = cast(pd.DataFrame, df0[aggregation])
-                    label = f"{str(measurement).replace(' ', '')}_{str(aggregation).replace(' ', '')}"
-                    df1.reset_index(
-                        [c for c in df1.index.names if c != "building_id"], drop=True
-                    ).to_excel(writer, sheet_name=label)
+            feature_levels = [c for c in df.index.names if c != "building_id"]
+            sheet_keys = df.columns.droplevel(["Meter", "Month"]).unique()
+            for measurement, aggregation in sheet_keys:
+                df1 = cast(pd.DataFrame, df.loc[:, (measurement, aggregation)])
+                label = f"{str(measurement).replace(' ', '')}_{str(aggregation).replace(' ', '')}"
+                df1.reset_index(feature_levels, drop=True).to_excel(
+                    writer, sheet_name=label
+                )
 
         print(f"Downloaded to {output_key.with_suffix('.xlsx').as_posix()}")
 
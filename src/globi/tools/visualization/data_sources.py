@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import io
+import json
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import pandas as pd
 
+from globi.s3_utils import default_s3_client
 from globi.tools.visualization.models import (
     DataSourceConfig,
     LocalDataSourceConfig,
@@ -17,10 +21,29 @@ from globi.tools.visualization.utils import (
     find_output_run_dirs,
     get_pq_file_for_run,
     load_output_table,
+    read_parquet_frame,
+    read_parquet_schema,
 )
 
 if TYPE_CHECKING:
     from mypy_boto3_s3 import S3Client
+    from scythe.experiments import BaseExperiment, ExperimentRun, SemVer
+
+# Resolving the latest version (and the latest run within it) lists prefixes in
+# S3, and streamlit re-runs the app on each interaction, so reuse a recent answer.
+LATEST_VERSION_TTL_SECONDS = 60.0
+_latest_versions: dict[tuple[str, str], tuple[float, SemVer]] = {}
+_latest_runs: dict[tuple[str, str, str], tuple[float, ExperimentRun]] = {}
+
+# Scanning for run folders walks the whole output tree. A scan is reused while
+# the base directory's mtime is unchanged; since runs are nested a few levels
+# deep (which does not touch that mtime), the TTL bounds how stale it can get.
+RUN_SCAN_TTL_SECONDS = 30.0
+_run_dir_scans: dict[Path, tuple[float, int, list[Path]]] = {}
+
+# Building locations are static inputs whose geometry parsing dominates a
+# rerun, so the parsed frame is kept until the file changes on disk.
+_building_locations: dict[Path, tuple[int, pd.DataFrame]] = {}
 
 
 class DataSource(ABC):
@@ -32,8 +55,20 @@ class DataSource(ABC):
         ...
 
     @abstractmethod
-    def load_run_data(self, run_id: str) -> pd.DataFrame:
-        """Load data for a specific run."""
+    def load_run_data(
+        self, run_id: str, columns: list[str] | list[tuple[str, ...]] | None = None
+    ) -> pd.DataFrame:
+        """Load data for a specific run, optionally only a subset of its columns."""
+        ...
+
+    @abstractmethod
+    def load_run_schema(self, run_id: str) -> pd.DataFrame:
+        """Load an empty frame with the columns and dtypes of a run's data."""
+        ...
+
+    @abstractmethod
+    def run_file_path(self, run_id: str) -> Path:
+        """Return the local parquet file backing a run's data."""
         ...
 
     @abstractmethod
@@ -60,16 +95,50 @@ class LocalDataSource(DataSource):
         self.config = config
         self._run_dirs: dict[str, Path] = {}
 
-    def list_available_runs(self) -> list[str]:
-        """List available run directories."""
-        run_dirs = find_output_run_dirs(self.config.base_dir)
+    def list_available_runs(self, refresh: bool = False) -> list[str]:
+        """List available run directories, reusing a recent scan unless refreshed."""
+        run_dirs = self._scan_run_dirs(refresh)
         self._run_dirs = {str(d.relative_to(self.config.base_dir)): d for d in run_dirs}
         return list(self._run_dirs.keys())
 
-    def load_run_data(self, run_id: str) -> pd.DataFrame:
+    def _scan_run_dirs(self, refresh: bool = False) -> list[Path]:
+        """Find run directories, keyed on the base directory's mtime and a TTL."""
+        base_dir = self.config.base_dir
+        try:
+            mtime_ns = base_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        cached = _run_dir_scans.get(base_dir)
+        now = time.monotonic()
+        if (
+            not refresh
+            and cached is not None
+            and cached[1] == mtime_ns
+            and now - cached[0] < RUN_SCAN_TTL_SECONDS
+        ):
+            return cached[2]
+
+        run_dirs = find_output_run_dirs(base_dir)
+        _run_dir_scans[base_dir] = (now, mtime_ns, run_dirs)
+        return run_dirs
+
+    def load_run_data(
+        self, run_id: str, columns: list[str] | list[tuple[str, ...]] | None = None
+    ) -> pd.DataFrame:
         """Load parquet data for a run."""
+        return load_output_table(self.run_file_path(run_id), columns=columns)
+
+    def load_run_schema(self, run_id: str) -> pd.DataFrame:
+        """Read the column layout of a run from its parquet footer."""
+        return read_parquet_schema(self.run_file_path(run_id))
+
+    def run_file_path(self, run_id: str) -> Path:
+        """Resolve the parquet file holding a run's data."""
         if run_id not in self._run_dirs:
             self.list_available_runs()
+        if run_id not in self._run_dirs:
+            self.list_available_runs(refresh=True)
 
         run_dir = self._run_dirs.get(run_id)
         if run_dir is None:
@@ -80,54 +149,124 @@ class LocalDataSource(DataSource):
         if pq_file is None:
             msg = f"No .pq file in {run_dir}"
             raise FileNotFoundError(msg)
-
-        return load_output_table(pq_file)
+        return pq_file
 
     def load_building_locations(self) -> pd.DataFrame | None:
-        """Load building locations from inputs/buildings.parquet."""
+        """Load building locations from inputs/buildings.parquet.
+
+        The parsed frame is shared between calls until the file's mtime changes,
+        so callers must not modify it in place.
+        """
         buildings_path = self.config.buildings_path or Path("inputs/buildings.parquet")
-        if not buildings_path.exists():
+        try:
+            mtime_ns = buildings_path.stat().st_mtime_ns
+        except FileNotFoundError:
             return None
 
+        cached = _building_locations.get(buildings_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        locations = self._read_building_locations(buildings_path)
+        _building_locations[buildings_path] = (mtime_ns, locations)
+        return locations
+
+    @staticmethod
+    def _read_building_locations(buildings_path: Path) -> pd.DataFrame:
+        """Read a buildings file into a frame with float64 lat/lon columns."""
         import geopandas as gpd
 
-        gdf = gpd.read_file(buildings_path)
+        if buildings_path.suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            # With lat/lon already stored, the geometry is never needed, so skip
+            # reading and decoding it altogether.
+            schema = pq.read_schema(buildings_path)
+            if "lat" in schema.names and "lon" in schema.names:
+                geo = json.loads((schema.metadata or {}).get(b"geo", b"{}"))
+                geometry_cols = set(geo.get("columns", {}))
+                gdf = read_parquet_frame(
+                    buildings_path,
+                    columns=[c for c in schema.names if c not in geometry_cols],
+                )
+            else:
+                # read_parquet goes through arrow; read_file would route via OGR.
+                gdf = gpd.read_parquet(buildings_path)
+        else:
+            gdf = gpd.read_file(buildings_path)
 
         if "lat" in gdf.columns and "lon" in gdf.columns:
-            gdf["lat"] = gdf["lat"].astype("float64")
-            gdf["lon"] = gdf["lon"].astype("float64")
+            for col in ("lat", "lon"):
+                if gdf[col].dtype != "float64":
+                    gdf[col] = gdf[col].astype("float64")
         else:
-            centroids = gdf.geometry.centroid
-            gdf["lat"] = centroids.y.astype("float64")
-            gdf["lon"] = centroids.x.astype("float64")
+            import shapely
+
+            centroids = shapely.centroid(gdf.geometry.to_numpy())
+            centroids[shapely.is_empty(centroids)] = None  # NaN rather than raise
+            gdf["lat"] = shapely.get_y(centroids)
+            gdf["lon"] = shapely.get_x(centroids)
 
-        return pd.DataFrame(gdf.drop(columns=["geometry"], errors="ignore"))
+        if "geometry" in gdf.columns:
+            gdf = gdf.drop(columns="geometry")
+        return pd.DataFrame(gdf)
 
 
 class S3DataSource(DataSource):
     """Data source for S3-stored experiment results."""
 
-    def __init__(self, config: S3DataSourceConfig) -> None:
+    def __init__(
+        self, config: S3DataSourceConfig, client: S3Client | None = None
+    ) -> None:
         """Init class for S3 data source."""
         self.config = config
-        self._client: S3Client | None = None
-        self._cached_path: Path | None = None
+        self._client = client
 
     @property
     def client(self) -> S3Client:
-        """Lazy-load S3 client."""
+        """The injected S3 client, or the shared default client."""
         if self._client is None:
-            import boto3
-
-            self._client = boto3.client("s3")
+            self._client = default_s3_client()
         return self._client
 
     def list_available_runs(self) -> list[str]:
         """For S3, return the configured run name."""
         return [self.config.run_name]
 
-    def load_run_data(self, run_id: str) -> pd.DataFrame:
-        """Download and load data from S3."""
+    def load_run_data(
+        self,
+        run_id: str,
+        columns: list[str] | list[tuple[str, ...]] | None = None,
+        *,
+        refresh: bool = False,
+    ) -> pd.DataFrame:
+        """Download and load data from S3.
+
+        Downloads are cached per run timestamp, so a newer run of the same version
+        is fetched once the latest-run lookup (reused for up to
+        LATEST_VERSION_TTL_SECONDS) sees it.
+        """
+        output_path, run = self._resolve_cache_path(refresh)
+        if output_path.exists() and not refresh:
+            return load_output_table(output_path, columns=columns)
+
+        buf = self._download(run, output_path)
+        buf.seek(0)
+        return read_parquet_frame(buf, columns=columns)
+
+    def load_run_schema(self, run_id: str) -> pd.DataFrame:
+        """Read the column layout of the run from its locally cached parquet file."""
+        return read_parquet_schema(self.run_file_path(run_id))
+
+    def run_file_path(self, run_id: str) -> Path:
+        """Return the locally cached parquet file of the latest run, downloading it if needed."""
+        output_path, run = self._resolve_cache_path()
+        if not output_path.exists():
+            self._download(run, output_path)
+        return output_path
+
+    def _resolve_cache_path(self, refresh: bool = False) -> tuple[Path, ExperimentRun]:
+        """Resolve the latest run of the configured version and its local cache file."""
         from scythe.experiments import BaseExperiment, SemVer
         from scythe.settings import ScytheStorageSettings
 
@@ -142,33 +281,89 @@ class S3DataSource(DataSource):
         if self.config.version:
             sem_version = SemVer.FromString(self.config.version)
         else:
-            exp_version = exp.latest_version(self.client, from_cache=False)
-            if exp_version is None:
-                msg = f"No version found for {self.config.run_name}"
-                raise ValueError(msg)
-            sem_version = exp_version.version
-
-        results_filekeys = exp.latest_results_for_version(sem_version)
-        if self.config.dataframe_key not in results_filekeys:
-            msg = f"Key {self.config.dataframe_key} not found"
-            raise ValueError(msg)
+            sem_version = self._latest_version(exp, s3_settings.BUCKET, refresh)
+        run = self._latest_run(exp, sem_version, s3_settings.BUCKET, refresh)
 
         output_path = (
             self.config.cache_dir
             / self.config.run_name
             / str(sem_version)
+            / run.dt_str
             / f"{self.config.dataframe_key}.pq"
         )
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path, run
 
-        self.client.download_file(
-            Bucket=s3_settings.BUCKET,
+    def _download(self, run: ExperimentRun, output_path: Path) -> io.BytesIO:
+        """Download the configured dataframe of a run into memory and the cache file."""
+        results_filekeys = run.list_results_files(self.client)
+        if self.config.dataframe_key not in results_filekeys:
+            msg = f"Key {self.config.dataframe_key} not found"
+            raise ValueError(msg)
+
+        # Decode straight from memory; the bytes are written to the cache once
+        # rather than downloaded to disk and read back.
+        buf = io.BytesIO()
+        self.client.download_fileobj(
+            Bucket=run.versioned_experiment.base_experiment.storage_settings.BUCKET,
             Key=results_filekeys[self.config.dataframe_key],
-            Filename=str(output_path),
+            Fileobj=buf,
         )
-
-        self._cached_path = output_path
-        return pd.read_parquet(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_suffix(".pq.tmp")
+        tmp_path.write_bytes(buf.getbuffer())
+        tmp_path.replace(output_path)
+        return buf
+
+    def _latest_version(
+        self, exp: BaseExperiment, bucket: str, refresh: bool = False
+    ) -> SemVer:
+        """Resolve the latest version of the run, reusing a lookup younger than the TTL."""
+        key = (bucket, self.config.run_name)
+        cached = _latest_versions.get(key)
+        now = time.monotonic()
+        if (
+            not refresh
+            and cached is not None
+            and now - cached[0] < LATEST_VERSION_TTL_SECONDS
+        ):
+            return cached[1]
+
+        exp_version = exp.latest_version(self.client, from_cache=False)
+        if exp_version is None:
+            msg = f"No version found for {self.config.run_name}"
+            raise ValueError(msg)
+        _latest_versions[key] = (now, exp_version.version)
+        return exp_version.version
+
+    def _latest_run(
+        self,
+        exp: BaseExperiment,
+        version: SemVer,
+        bucket: str,
+        refresh: bool = False,
+    ) -> ExperimentRun:
+        """Resolve the newest run of a version, reusing a lookup younger than the TTL."""
+        from scythe.experiments import VersionedExperiment
+
+        key = (bucket, self.config.run_name, str(version))
+        cached = _latest_runs.get(key)
+        now = time.monotonic()
+        if (
+            not refresh
+            and cached is not None
+            and now - cached[0] < LATEST_VERSION_TTL_SECONDS
+        ):
+            return cached[1]
+
+        runs = VersionedExperiment(base_experiment=exp, version=version).list_runs(
+            self.client
+        )
+        if not runs:
+            msg = f"No runs found for {self.config.run_name} {version}"
+            raise ValueError(msg)
+        run = max(runs, key=lambda r: r.timestamp)
+        _latest_runs[key] = (now, run)
+        return run
 
     def load_building_locations(self) -> pd.DataFrame | None:
         """S3 source doesn't have local building locations by default."""
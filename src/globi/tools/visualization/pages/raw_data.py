@@ -2,29 +2,29 @@
 
 from __future__ import annotations
 
+import io
+import zipfile
+
 import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
 
 from globi.tools.visualization.data_sources import DataSource
-from globi.tools.visualization.models import Building3DConfig
 from globi.tools.visualization.plotting import (
-    create_column_layer_chart,
-    create_histogram_d3_html,
-    create_monthly_timeseries_d3_html,
-    create_pie_d3_html,
-    create_polygon_layer_chart,
     create_raw_data_d3_html,
-    extract_building_polygons,
+    create_results_dashboard_d3_html,
+)
+from globi.tools.visualization.results_data import (
+    extract_d3_data,
+    is_results_format,
+    summary_columns,
 )
-from globi.tools.visualization.results_data import extract_d3_data, is_results_format
 from globi.tools.visualization.utils import (
     LAT_COL,
     LON_COL,
     has_geo_columns,
     list_categorical_columns,
     list_numeric_columns,
-    merge_with_building_locations,
 )
 
 
@@ -41,17 +41,23 @@ def render_raw_data_page(data_source: DataSource) -> None:
 
     try:
         with st.spinner(f"Loading {selected_run}..."):
-            df = data_source.load_run_data(selected_run)
+            schema = data_source.load_run_schema(selected_run)
+            # Results outputs only need the groups the summary reads; generic
+            # outputs are read column-by-selection further down.
+            df = (
+                data_source.load_run_data(selected_run, columns=summary_columns(schema))
+                if is_results_format(schema)
+                else None
+            )
     except Exception as e:
         st.error(f"Failed to load data: {e}")
         return
 
-    st.caption(f"Shape: {df.shape[0]} rows x {df.shape[1]} columns")
-
-    if is_results_format(df):
+    if df is not None:
+        st.caption(f"Shape: {df.shape[0]} rows x {df.shape[1]} columns")
         _render_results_format(df, selected_run, data_source)
     else:
-        _render_generic_format(df)
+        _render_generic_format(schema, selected_run, data_source)
 
 
 def _render_results_format(
@@ -59,130 +65,96 @@ def _render_results_format(
     run_label: str,
     data_source: DataSource,
 ) -> None:
-    """Render Results.pq format with summary and map tabs."""
-    summary_tab, map_tab = st.tabs(["Summary", "Map"])
-
-    with summary_tab:
-        _render_results_summary(df, run_label)
+    """Render Results.pq format with a summary or map view."""
+    # st.tabs runs every tab body on each rerun; a radio only runs the shown one,
+    # so the footprint extraction is skipped until the map is actually opened.
+    view = st.radio("View", options=["Summary", "Map"], index=0, horizontal=True)
 
-    with map_tab:
-        _render_results_map(df, data_source)
+    if view == "Summary":
+        _render_results_summary(df, run_label, data_source)
+    else:
+        _render_results_map(df, run_label, data_source)
 
 
-def _render_results_summary(df: pd.DataFrame, run_label: str) -> None:
+def _render_results_summary(
+    df: pd.DataFrame, run_label: str, data_source: DataSource
+) -> None:
     """Render D3 summary visualizations for Results format."""
     st.markdown("### Results Summary")
 
-    d3_data = extract_d3_data(df, region_name=run_label, scenario_name="")
-
-    st.subheader("EUI Distribution")
-    components.html(
-        create_histogram_d3_html(d3_data["eui"], "EUI Distribution", "EUI (kWh/m2)"),
-        height=320,
-        scrolling=False,
-    )
-    st.download_button(
-        "Download EUI Values (CSV)",
-        pd.Series(d3_data["eui"], name="eui").to_csv(index=False),
-        file_name="eui_values.csv",
-        mime="text/csv",
-    )
+    pq_file = data_source.run_file_path(run_label)
+    file_key = (str(pq_file), pq_file.stat().st_mtime_ns)
+    d3_data = _summary_d3_data(df, *file_key, run_label)
 
-    st.subheader("Peak Distribution")
+    # One iframe for all six charts: d3 and the payload are loaded once.
     components.html(
-        create_histogram_d3_html(d3_data["peak"], "Peak Distribution", "Peak (kW/m2)"),
-        height=320,
+        _summary_dashboard_html(d3_data, *file_key, run_label),
+        height=1900,
         scrolling=False,
     )
-    st.download_button(
-        "Download Peak Values (CSV)",
-        pd.Series(d3_data["peak"], name="peak").to_csv(index=False),
-        file_name="peak_values.csv",
-        mime="text/csv",
-    )
 
-    st.subheader("End Uses and Utilities Share")
-    col_end_uses, col_utilities = st.columns(2)
-
-    with col_end_uses:
-        components.html(
-            create_pie_d3_html(
-                d3_data["end_uses_total"],
-                "End Uses Share",
-                d3_data["end_use_colors"],
-            ),
-            height=320,
-            scrolling=False,
-        )
-        st.download_button(
-            "Download End Use Totals (CSV)",
-            pd.Series(d3_data["end_uses_total"], name="energy_kwh")
-            .rename_axis("end_use")
-            .to_csv(),
-            file_name="end_uses_total.csv",
-            mime="text/csv",
-        )
-
-    with col_utilities:
-        components.html(
-            create_pie_d3_html(
-                d3_data["utilities_total"],
-                "Utilities Share",
-                d3_data["fuel_colors"],
-            ),
-            height=320,
-            scrolling=False,
-        )
-        st.download_button(
-            "Download Utilities Totals (CSV)",
-            pd.Series(d3_data["utilities_total"], name="energy_kwh")
-            .rename_axis("utility")
-            .to_csv(),
-            file_name="utilities_total.csv",
-            mime="text/csv",
-        )
-
-    st.subheader("Monthly EUI by End Use")
-    components.html(
-        create_monthly_timeseries_d3_html(
-            d3_data["monthly_end_uses"],
-            d3_data["end_use_meters"],
-            d3_data["end_use_colors"],
-            "Monthly EUI by End Use",
-            "EUI (kWh/m2)",
-        ),
-        height=360,
-        scrolling=False,
-    )
-    st.download_button(
-        "Download Monthly End Uses (CSV)",
-        pd.DataFrame(d3_data["monthly_end_uses"]).to_csv(index=False),
-        file_name="monthly_end_uses.csv",
-        mime="text/csv",
-    )
-
-    st.subheader("Monthly EUI by Utility")
-    components.html(
-        create_monthly_timeseries_d3_html(
-            d3_data["monthly_fuels"],
-            d3_data["fuel_meters"],
-            d3_data["fuel_colors"],
-            "Monthly EUI by Utility",
-            "EUI (kWh/m2)",
-        ),
-        height=360,
-        scrolling=False,
-    )
     st.download_button(
-        "Download Monthly Utilities (CSV)",
-        pd.DataFrame(d3_data["monthly_fuels"]).to_csv(index=False),
-        file_name="monthly_utilities.csv",
-        mime="text/csv",
+        "Download Summary Tables (ZIP of CSVs)",
+        _summary_csv_zip(d3_data, *file_key, run_label),
+        file_name="results_summary.zip",
+        mime="application/zip",
     )
 
 
-def _render_results_map(df: pd.DataFrame, data_source: DataSource) -> None:
+@st.cache_data(show_spinner=False)
+def _summary_d3_data(
+    _df: pd.DataFrame, pq_file: str, mtime_ns: int, run_label: str
+) -> dict:
+    """Summarise a Results frame for the D3 charts, once per version of its file.
+
+    The frame is a pure function of the parquet file, so the cache is keyed on
+    the file's path and mtime; `_df` is left out of the hash.
+    """
+    return extract_d3_data(_df, region_name=run_label, scenario_name="")
+
+
+@st.cache_data(show_spinner=False)
+def _summary_dashboard_html(
+    _d3_data: dict, pq_file: str, mtime_ns: int, run_label: str
+) -> str:
+    """Render the summary dashboard, JSON-encoding its payload once per file version."""
+    return create_results_dashboard_d3_html(_d3_data)
+
+
+@st.cache_data(show_spinner=False)
+def _summary_csv_zip(
+    _d3_data: dict, pq_file: str, mtime_ns: int, run_label: str
+) -> bytes:
+    """Zip the summary tables as CSVs, once per version of the run file.
+
+    Download buttons need their data up front and Streamlit hashes and stores it
+    on every rerun, so one compressed archive is handed over instead of six
+    separate tables.
+    """
+    end_uses = pd.Series(_d3_data["end_uses_total"], name="energy_kwh")
+    utilities = pd.Series(_d3_data["utilities_total"], name="energy_kwh")
+    tables = {
+        "eui_values.csv": pd.Series(_d3_data["eui"], name="eui").to_frame(),
+        "peak_values.csv": pd.Series(_d3_data["peak"], name="peak").to_frame(),
+        "end_uses_total.csv": end_uses.rename_axis("end_use").reset_index(),
+        "utilities_total.csv": utilities.rename_axis("utility").reset_index(),
+        "monthly_end_uses.csv": pd.DataFrame(_d3_data["monthly_end_uses"]),
+        "monthly_utilities.csv": pd.DataFrame(_d3_data["monthly_fuels"]),
+    }
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, table in tables.items():
+            zf.writestr(name, table.to_csv(index=False))
+    return buf.getvalue()
+
+
+def _render_results_map(
+    df: pd.DataFrame, run_label: str, data_source: DataSource
+) -> None:
     """Render 3D building map for Results format."""
+    from globi.tools.visualization.models import Building3DConfig
+    from globi.tools.visualization.plotting import create_polygon_layer_chart
+
     st.markdown("### 3D Building Map")
 
     locations_df = data_source.load_building_locations()
@@ -192,14 +164,20 @@ def _render_results_map(df: pd.DataFrame, data_source: DataSource) -> None:
         )
         return
 
-    merged = merge_with_building_locations(df, locations_df)
-    if merged is None:
-        st.info("No matching building IDs between outputs and locations.")
-        return
-
+    pq_file = data_source.run_file_path(run_label)
     try:
-        features = extract_building_polygons(merged, "height")
-        if not features:
+        features = _building_features(
+            df,
+            locations_df,
+            str(pq_file),
+            pq_file.stat().st_mtime_ns,
+            id(locations_df),
+            "height",
+        )
+        if features is None:
+            st.info("No matching building IDs between outputs and locations.")
+            return
+        if features.empty:
             st.info("No valid building polygons found.")
             return
 
@@ -210,31 +188,71 @@ def _render_results_map(df: pd.DataFrame, data_source: DataSource) -> None:
         st.warning(str(e))
 
 
-def _render_generic_format(df: pd.DataFrame) -> None:
-    """Render generic parquet format with map and D3 summaries."""
+@st.cache_data(show_spinner=False)
+def _building_features(
+    _df: pd.DataFrame,
+    _locations_df: pd.DataFrame,
+    pq_file: str,
+    mtime_ns: int,
+    locations_id: int,
+    height_col: str,
+) -> pd.DataFrame | None:
+    """Join a Results frame to building locations and extract footprint polygons.
+
+    Keyed on the run file's path and mtime and on the locations frame's id: data
+    sources return the same locations frame until its file changes. Returns None
+    when no building ids match.
+    """
+    from globi.tools.visualization.plotting import build_polygon_features
+
+    return build_polygon_features(_df, _locations_df, height_col)
+
+
+def _render_generic_format(
+    schema: pd.DataFrame, run_id: str, data_source: DataSource
+) -> None:
+    """Render generic parquet format with map and D3 summaries.
+
+    Column choices are made from the schema, and only the chosen columns (plus
+    the non-numeric ones, to detect categories) are read from the file.
+    """
+    geo = has_geo_columns(schema)
     numeric_cols = list_numeric_columns(
-        df, exclude=[LAT_COL, LON_COL] if has_geo_columns(df) else None
+        schema, exclude=[LAT_COL, LON_COL] if geo else None
     )
 
     st.markdown("### Map Overview")
-    if not has_geo_columns(df):
-        st.info("No lat/lon columns found; map unavailable.")
+    map_slot = st.container()
+    metric = None
+    if not geo:
+        map_slot.info("No lat/lon columns found; map unavailable.")
     elif not numeric_cols:
-        st.info("No numeric columns available for height metric.")
+        map_slot.info("No numeric columns available for height metric.")
     else:
-        metric = st.selectbox("Metric for Column Height", options=numeric_cols)
+        metric = map_slot.selectbox("Metric for Column Height", options=numeric_cols)
+
+    st.markdown("### Summary Visualizations")
+    value_col = (
+        st.selectbox("Value Column", options=numeric_cols, index=0)
+        if numeric_cols
+        else None
+    )
+
+    df = _load_generic_columns(schema, run_id, data_source, metric, value_col)
+    st.caption(f"Shape: {df.shape[0]} rows x {schema.shape[1]} columns")
+
+    if metric is not None:
+        from globi.tools.visualization.plotting import create_column_layer_chart
+
         try:
-            deck = create_column_layer_chart(df, metric)
-            st.pydeck_chart(deck)
+            map_slot.pydeck_chart(create_column_layer_chart(df, metric))
         except ValueError as e:
-            st.warning(str(e))
+            map_slot.warning(str(e))
 
-    st.markdown("### Summary Visualizations")
-    if not numeric_cols:
+    if value_col is None:
         st.info("No numeric columns available for summaries.")
         return
 
-    value_col = st.selectbox("Value Column", options=numeric_cols, index=0)
     categorical_cols = list_categorical_columns(df)
     category_col = st.selectbox(
         "Category Column (optional)",
@@ -243,7 +261,47 @@ def _render_generic_format(df: pd.DataFrame) -> None:
     )
     category = None if category_col == "(none)" else category_col
 
-    html = create_raw_data_d3_html(
-        df, value_column=value_col, category_column=category, title="Raw Data Summary"
+    pq_file = data_source.run_file_path(run_id)
+    html = _raw_data_html(
+        df, str(pq_file), pq_file.stat().st_mtime_ns, value_col, category
     )
     components.html(html, height=700, scrolling=True)
+
+
+@st.cache_data(show_spinner=False)
+def _raw_data_html(
+    _df: pd.DataFrame,
+    pq_file: str,
+    mtime_ns: int,
+    value_col: str | tuple[str, ...],
+    category: str | tuple[str, ...] | None,
+) -> str:
+    """Render the raw data summary, once per run file version and column choice.
+
+    The page embeds every row as JSON; the chosen columns are fixed by the file,
+    so other widget changes reuse the rendered page rather than re-encoding it.
+    """
+    return create_raw_data_d3_html(
+        _df, value_column=value_col, category_column=category, title="Raw Data Summary"
+    )
+
+
+def _load_generic_columns(
+    schema: pd.DataFrame,
+    run_id: str,
+    data_source: DataSource,
+    *selected: str | tuple[str, ...] | None,
+) -> pd.DataFrame:
+    """Load the geo, selected and non-numeric columns of a generic run."""
+    if isinstance(schema.columns, pd.MultiIndex):
+        # Parquet stores tuple labels as strings, so read everything instead.
+        return data_source.load_run_data(run_id)
+
+    wanted = {LAT_COL, LON_COL, *(c for c in selected if c is not None)}
+    columns = [
+        c
+        for c in schema.columns
+        if c in wanted or not pd.api.types.is_numeric_dtype(schema[c])
+    ]
+    with st.spinner(f"Loading {run_id}..."):
+        return data_source.load_run_data(run_id, columns=columns)
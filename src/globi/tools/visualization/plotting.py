@@ -4,16 +4,28 @@ from __future__ import annotations
 
 import json
 import math
+from functools import cache
 from textwrap import dedent
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
-import pydeck as pdk
-from shapely import wkt as shapely_wkt
-from shapely.geometry import MultiPolygon, Polygon
 
 from .models import Building3DConfig
-from .utils import LAT_COL, LON_COL, ROTATED_RECTANGLE_COL, sanitize_for_json
+from .utils import (
+    BUILDING_ID_COL,
+    LAT_COL,
+    LON_COL,
+    ROTATED_RECTANGLE_COL,
+    merge_with_building_locations,
+    sanitize_for_json,
+)
+
+if TYPE_CHECKING:
+    import pydeck as pdk
+
+# pydeck and shapely are imported inside the map functions, so the D3 summaries
+# can be rendered without loading them.
 
 
 def create_raw_data_d3_html(
@@ -383,121 +395,288 @@ def create_raw_data_d3_html(
     return dedent(html)
 
 
+_D3_CARD_CSS = """
+body { font-family: system-ui, sans-serif; margin: 0; padding: 0.5rem; }
+.chart { width: 100%; }
+.legend { display: flex; flex-wrap: wrap; gap: 0.5rem; font-size: 0.75rem; margin-top: 0.5rem; }
+.legend-item { display: flex; align-items: center; gap: 0.4rem; }
+.legend-color { width: 12px; height: 12px; border-radius: 2px; }
+.axis-label { fill: #4b5563; font-size: 11px; }
+.tooltip {
+  position: absolute;
+  background: #111827;
+  color: #e5e7eb;
+  padding: 0.35rem 0.55rem;
+  border-radius: 0.5rem;
+  font-size: 0.75rem;
+  pointer-events: none;
+  z-index: 1000;
+}
+"""
+
+_HISTOGRAM_JS = """
+function renderHistogram(container, tooltip, payload) {
+  const counts = payload.counts || [];
+  const edges = payload.edges || [];
+  if (!counts.length) {
+    container.innerHTML = "no data available";
+    return;
+  }
+  const width = container.clientWidth || 360;
+  const height = 260;
+  const margin = { top: 16, right: 16, bottom: 40, left: 52 };
+  const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
+  const chartWidth = width - margin.left - margin.right;
+  const chartHeight = height - margin.top - margin.bottom;
+  const g = svg.append("g").attr("transform", "translate(" + margin.left + "," + margin.top + ")");
+  const bins = counts.map((c, i) => ({ x0: edges[i], x1: edges[i + 1], length: c }));
+  const x = d3.scaleLinear().domain([edges[0], edges[edges.length - 1]]).nice().range([0, chartWidth]);
+  const y = d3.scaleLinear().domain([0, d3.max(counts) || 1]).nice().range([chartHeight, 0]);
+  g.append("g").attr("transform", "translate(0," + chartHeight + ")").call(d3.axisBottom(x).ticks(6));
+  g.append("g").call(d3.axisLeft(y).ticks(5));
+  g.selectAll("rect")
+    .data(bins)
+    .enter()
+    .append("rect")
+    .attr("x", d => x(d.x0))
+    .attr("y", d => y(d.length))
+    .attr("width", d => Math.max(0, x(d.x1) - x(d.x0) - 1))
+    .attr("height", d => chartHeight - y(d.length))
+    .attr("fill", "#4f46e5")
+    .attr("opacity", 0.85)
+    .on("mouseover", (event, d) => {
+      tooltip.style("opacity", 1)
+        .html("range: [" + d3.format(",.2f")(d.x0) + ", " + d3.format(",.2f")(d.x1) + ")<br/>count: " + d.length)
+        .style("left", (event.pageX + 10) + "px")
+        .style("top", (event.pageY - 28) + "px");
+    })
+    .on("mouseout", () => tooltip.style("opacity", 0));
+
+  // kde overlay
+  const kdeX = payload.kde_x || [];
+  const kdeY = payload.kde_y || [];
+  const kdeScale = d3.scaleLinear()
+    .domain([0, d3.max(kdeY) || 1])
+    .range([chartHeight, 0]);
+  const kdeLine = d3.line()
+    .x((d, i) => x(kdeX[i]))
+    .y(d => kdeScale(d))
+    .curve(d3.curveBasis);
+  g.append("path")
+    .datum(kdeY)
+    .attr("fill", "none")
+    .attr("stroke", "#ef4444")
+    .attr("stroke-width", 2)
+    .attr("d", kdeLine);
+  svg.append("text")
+    .attr("class", "axis-label")
+    .attr("text-anchor", "middle")
+    .attr("x", margin.left + chartWidth / 2)
+    .attr("y", height - 8)
+    .text(payload.x_label || "");
+  svg.append("text")
+    .attr("class", "axis-label")
+    .attr("text-anchor", "middle")
+    .attr("transform", "rotate(-90)")
+    .attr("x", -(margin.top + chartHeight / 2))
+    .attr("y", 16)
+    .text("count");
+}
+"""
+
+_PIE_JS = """
+function renderPie(container, legend, tooltip, payload) {
+  const entries = Object.entries(payload.values || {}).filter(([k, v]) => v > 0);
+  if (!entries.length) {
+    container.innerHTML = "no data available";
+    return;
+  }
+  const width = Math.min(container.clientWidth || 280, 280);
+  const height = 260;
+  const radius = Math.min(width, height) / 2 - 20;
+  const data = entries.map(([label, value]) => ({ label, value }));
+  const color = d3.scaleOrdinal()
+    .domain(data.map(d => d.label))
+    .range(data.map(d => payload.colors[d.label] || "#94a3b8"));
+  const pie = d3.pie().value(d => d.value).sort(null);
+  const arc = d3.arc().innerRadius(0).outerRadius(radius);
+  const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
+  const g = svg.append("g").attr("transform", "translate(" + width / 2 + "," + height / 2 + ")");
+  g.selectAll("path")
+    .data(pie(data))
+    .enter()
+    .append("path")
+    .attr("d", arc)
+    .attr("fill", d => color(d.data.label))
+    .attr("stroke", "#fff")
+    .attr("stroke-width", 1)
+    .on("mouseover", (event, d) => {
+      const total = d3.sum(data, i => i.value) || 1;
+      const pct = (d.data.value / total) * 100;
+      tooltip.style("opacity", 1)
+        .html("<strong>" + d.data.label + "</strong><br/>" + d3.format(",.0f")(d.data.value) + " kWh<br/>" + d3.format(".1f")(pct) + "%")
+        .style("left", (event.pageX + 10) + "px")
+        .style("top", (event.pageY - 28) + "px");
+    })
+    .on("mouseout", () => tooltip.style("opacity", 0));
+
+  data.forEach(d => {
+    const item = document.createElement("div");
+    item.className = "legend-item";
+    item.innerHTML = '<div class="legend-color" style="background:' + color(d.label) + '"></div><span>' + d.label + '</span>';
+    legend.appendChild(item);
+  });
+}
+"""
+
+_MONTHLY_TIMESERIES_JS = """
+function renderMonthlyTimeseries(container, legend, tooltip, payload) {
+  const data = payload.records || [];
+  const meters = payload.meters || [];
+  const colors = payload.colors || {};
+  const monthNames = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"];
+  if (!data.length) {
+    container.innerHTML = "no data available";
+    return;
+  }
+  const width = container.clientWidth || 480;
+  const height = 300;
+  const margin = { top: 20, right: 20, bottom: 40, left: 52 };
+  const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
+  const chartWidth = width - margin.left - margin.right;
+  const chartHeight = height - margin.top - margin.bottom;
+  const g = svg.append("g").attr("transform", "translate(" + margin.left + "," + margin.top + ")");
+  const x = d3.scaleBand().domain(d3.range(1, 13)).range([0, chartWidth]).padding(0.1);
+  const y = d3.scaleLinear()
+    .domain([0, d3.max(data, d => d.avg) || 1])
+    .nice()
+    .range([chartHeight, 0]);
+  const area = d3.area()
+    .x(d => x(d.month) + x.bandwidth() / 2)
+    .y0(d => y(d.ci_low))
+    .y1(d => y(d.ci_high))
+    .curve(d3.curveMonotoneX);
+  const line = d3.line()
+    .x(d => x(d.month) + x.bandwidth() / 2)
+    .y(d => y(d.avg))
+    .curve(d3.curveMonotoneX);
+  meters.forEach((meter, idx) => {
+    const series = data.filter(d => d.meter === meter).sort((a, b) => a.month - b.month);
+    if (!series.length) return;
+    const color = colors[meter] || d3.schemeCategory10[idx % 10];
+    g.append("path").datum(series).attr("d", area).attr("fill", color).attr("opacity", 0.15);
+    g.append("path").datum(series).attr("d", line).attr("stroke", color).attr("fill", "none").attr("stroke-width", 2).attr("opacity", 0.85);
+    g.selectAll("circle." + meter.replace(/\\s+/g, "-"))
+      .data(series)
+      .enter()
+      .append("circle")
+      .attr("cx", d => x(d.month) + x.bandwidth() / 2)
+      .attr("cy", d => y(d.avg))
+      .attr("r", 3)
+      .attr("fill", color)
+      .attr("opacity", 0.9)
+      .on("mouseover", (event, d) => {
+        tooltip.style("opacity", 1)
+          .html("<strong>" + meter + "</strong><br/>month: " + monthNames[d.month - 1] + "<br/>avg: " + d3.format(",.2f")(d.avg))
+          .style("left", (event.pageX + 10) + "px")
+          .style("top", (event.pageY - 28) + "px");
+      })
+      .on("mouseout", () => tooltip.style("opacity", 0));
+    const item = document.createElement("div");
+    item.className = "legend-item";
+    item.innerHTML = '<div class="legend-color" style="background:' + color + '"></div><span>' + meter + '</span>';
+    legend.appendChild(item);
+  });
+  g.append("g").attr("transform", "translate(0," + chartHeight + ")").call(d3.axisBottom(x).tickFormat((d, i) => monthNames[i]));
+  g.append("g").call(d3.axisLeft(y).ticks(6));
+  svg.append("text").attr("class", "axis-label").attr("text-anchor", "middle").attr("x", margin.left + chartWidth / 2).attr("y", height - 8).text("month");
+  svg.append("text").attr("class", "axis-label").attr("text-anchor", "middle").attr("transform", "rotate(-90)").attr("x", -(margin.top + chartHeight / 2)).attr("y", 16).text(payload.y_label || "");
+}
+"""
+
+
+def _d3_card_html(title: str, body: str, script: str, css: str = "") -> str:
+    """Wrap chart markup and render calls in a standalone HTML document with d3."""
+    return f"""<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <title>{title}</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <style>{_D3_CARD_CSS}{css}</style>
+    <script src="https://d3js.org/d3.v7.min.js"></script>
+  </head>
+  <body>
+    {body}
+    <script>
+      const tooltip = d3.select("body").append("div").attr("class", "tooltip").style("opacity", 0);
+      {script}
+    </script>
+  </body>
+</html>
+"""
+
+
+def _display_precision(values: np.ndarray, digits: int = 4) -> list[float]:
+    """Round values to `digits` significant digits of their largest magnitude.
+
+    The charts cannot show more than that, and the shorter numbers cut the
+    size of the JSON inlined into the page.
+    """
+    scale = np.abs(values).max() if values.size else 0.0
+    if not np.isfinite(scale) or scale == 0:
+        return values.tolist()
+    decimals = max(digits - 1 - math.floor(math.log10(scale)), 0)
+    return np.round(values, decimals).tolist()
+
+
+def _histogram_payload(values: list[float], x_label: str) -> dict[str, Any]:
+    """Bin samples for a d3 histogram, with a kernel density curve over the bins.
+
+    Only the bin counts and a fixed-size density curve are sent to the browser,
+    so the payload and the client's work do not grow with the number of samples.
+    The density uses a gaussian kernel with bandwidth range/40, evaluated on
+    200 points from a fine histogram of the samples.
+    """
+    arr = np.asarray(values, dtype="float64")
+    arr = arr[np.isfinite(arr)]
+    if arr.size == 0:
+        return {"counts": [], "edges": [], "kde_x": [], "kde_y": [], "x_label": x_label}
+
+    bin_count = min(80, max(20, int(np.sqrt(arr.size))))
+    counts, edges = np.histogram(arr, bins=bin_count)
+
+    lo, hi = edges[0], edges[-1]
+    bandwidth = (hi - lo) / 40 or 1.0
+    fine_counts, fine_edges = np.histogram(arr, bins=1024, range=(lo, hi))
+    fine_centers = (fine_edges[:-1] + fine_edges[1:]) / 2
+    kde_x = np.linspace(lo, hi, 200)
+    z = (kde_x[:, None] - fine_centers[None, :]) / bandwidth
+    norm = arr.size * bandwidth * math.sqrt(2 * math.pi)
+    kde_y = np.exp(-0.5 * z * z) @ fine_counts / norm
+    return {
+        "counts": counts.tolist(),
+        "edges": _display_precision(edges),
+        "kde_x": _display_precision(kde_x),
+        "kde_y": _display_precision(kde_y),
+        "x_label": x_label,
+    }
+
+
 def create_histogram_d3_html(
     values: list[float],
     title: str,
     x_label: str,
 ) -> str:
-    """Build a histogram d3 card."""
-    payload = {"values": values, "title": title, "x_label": x_label}
+    """Build a histogram d3 card; the samples are binned before embedding."""
+    payload = {**_histogram_payload(values, x_label), "title": title}
     data_json = json.dumps(payload, ensure_ascii=False)
-    html = f"""
-    <!doctype html>
-    <html lang="en">
-      <head>
-        <meta charset="utf-8" />
-        <title>{title}</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <style>
-          body {{ font-family: system-ui, sans-serif; margin: 0; padding: 0.5rem; }}
-          .chart {{ width: 100%; height: 260px; }}
-          .axis-label {{ fill: #4b5563; font-size: 11px; }}
-          .tooltip {{
-            position: absolute;
-            background: #111827;
-            color: #e5e7eb;
-            padding: 0.35rem 0.55rem;
-            border-radius: 0.5rem;
-            font-size: 0.75rem;
-            pointer-events: none;
-            z-index: 1000;
-          }}
-        </style>
-        <script src="https://d3js.org/d3.v7.min.js"></script>
-      </head>
-      <body>
-        <div id="hist" class="chart"></div>
-        <script>
-          const payload = {data_json};
-          const values = payload.values || [];
-          const container = document.getElementById("hist");
-          const tooltip = d3.select("body").append("div").attr("class", "tooltip").style("opacity", 0);
-          if (!values.length) {{
-            container.innerHTML = "no data available";
-          }} else {{
-            const width = container.clientWidth || 360;
-            const height = 260;
-            const margin = {{ top: 16, right: 16, bottom: 40, left: 52 }};
-            const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
-            const chartWidth = width - margin.left - margin.right;
-            const chartHeight = height - margin.top - margin.bottom;
-            const g = svg.append("g").attr("transform", "translate(" + margin.left + "," + margin.top + ")");
-            const x = d3.scaleLinear().domain(d3.extent(values)).nice().range([0, chartWidth]);
-            const bins = d3.bin().domain(x.domain()).thresholds(25)(values);
-            const y = d3.scaleLinear().domain([0, d3.max(bins, d => d.length) || 1]).nice().range([chartHeight, 0]);
-            g.append("g").attr("transform", "translate(0," + chartHeight + ")").call(d3.axisBottom(x).ticks(6));
-            g.append("g").call(d3.axisLeft(y).ticks(5));
-            g.selectAll("rect")
-              .data(bins)
-              .enter()
-              .append("rect")
-              .attr("x", d => x(d.x0))
-              .attr("y", d => y(d.length))
-              .attr("width", d => Math.max(0, x(d.x1) - x(d.x0) - 1))
-              .attr("height", d => chartHeight - y(d.length))
-              .attr("fill", "#4f46e5")
-              .attr("opacity", 0.85)
-              .on("mouseover", (event, d) => {{
-                tooltip.style("opacity", 1)
-                  .html("range: [" + d3.format(",.2f")(d.x0) + ", " + d3.format(",.2f")(d.x1) + ")<br/>count: " + d.length)
-                  .style("left", (event.pageX + 10) + "px")
-                  .style("top", (event.pageY - 28) + "px");
-              }})
-              .on("mouseout", () => tooltip.style("opacity", 0));
-
-            // kde overlay
-            const kdeBandwidth = (x.domain()[1] - x.domain()[0]) / 40 || 1;
-            const kdeX = d3.range(x.domain()[0], x.domain()[1], (x.domain()[1] - x.domain()[0]) / 200);
-            const kernel = v => Math.exp(-0.5 * v * v) / Math.sqrt(2 * Math.PI);
-            const kdeY = kdeX.map(xv => {{
-              let sum = 0;
-              values.forEach(v => {{
-                sum += kernel((xv - v) / kdeBandwidth);
-              }});
-              return sum / (values.length * kdeBandwidth);
-            }});
-            const kdeScale = d3.scaleLinear()
-              .domain([0, d3.max(kdeY) || 1])
-              .range([chartHeight, 0]);
-            const kdeLine = d3.line()
-              .x((d, i) => x(kdeX[i]))
-              .y(d => kdeScale(d))
-              .curve(d3.curveBasis);
-            g.append("path")
-              .datum(kdeY)
-              .attr("fill", "none")
-              .attr("stroke", "#ef4444")
-              .attr("stroke-width", 2)
-              .attr("d", kdeLine);
-            svg.append("text")
-              .attr("class", "axis-label")
-              .attr("text-anchor", "middle")
-              .attr("x", margin.left + chartWidth / 2)
-              .attr("y", height - 8)
-              .text(payload.x_label || "");
-            svg.append("text")
-              .attr("class", "axis-label")
-              .attr("text-anchor", "middle")
-              .attr("transform", "rotate(-90)")
-              .attr("x", -(margin.top + chartHeight / 2))
-              .attr("y", 16)
-              .text("count");
-          }}
-        </script>
-      </body>
-    </html>
-    """
-    return dedent(html)
+    return _d3_card_html(
+        title,
+        '<div id="hist" class="chart" style="height: 260px"></div>',
+        f"""{_HISTOGRAM_JS}
+      renderHistogram(document.getElementById("hist"), tooltip, {data_json});""",
+    )
 
 
 def create_pie_d3_html(
@@ -508,85 +687,18 @@ def create_pie_d3_html(
     """Build a pie d3 card."""
     payload = {"values": values, "title": title, "colors": colors or {}}
     data_json = json.dumps(payload, ensure_ascii=False)
-    html = f"""
-    <!doctype html>
-    <html lang="en">
-      <head>
-        <meta charset="utf-8" />
-        <title>{title}</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <style>
-          body {{ font-family: system-ui, sans-serif; margin: 0; padding: 0.5rem; }}
-          .chart {{ width: 100%; height: 240px; }}
-          .legend {{ display: flex; flex-wrap: wrap; gap: 0.5rem; font-size: 0.75rem; margin-top: 0.5rem; }}
-          .legend-item {{ display: flex; align-items: center; gap: 0.4rem; }}
-          .legend-color {{ width: 12px; height: 12px; border-radius: 2px; }}
-          .tooltip {{
-            position: absolute;
-            background: #111827;
-            color: #e5e7eb;
-            padding: 0.35rem 0.55rem;
-            border-radius: 0.5rem;
-            font-size: 0.75rem;
-            pointer-events: none;
-            z-index: 1000;
-          }}
-        </style>
-        <script src="https://d3js.org/d3.v7.min.js"></script>
-      </head>
-      <body>
-        <div id="pie" class="chart"></div>
-        <div id="legend" class="legend"></div>
-        <script>
-          const payload = {data_json};
-          const entries = Object.entries(payload.values || {{}}).filter(([k, v]) => v > 0);
-          const container = document.getElementById("pie");
-          const legend = document.getElementById("legend");
-          const tooltip = d3.select("body").append("div").attr("class", "tooltip").style("opacity", 0);
-          if (!entries.length) {{
-            container.innerHTML = "no data available";
-          }} else {{
-            const width = Math.min(container.clientWidth || 280, 280);
-            const height = 260;
-            const radius = Math.min(width, height) / 2 - 20;
-            const data = entries.map(([label, value]) => ({{ label, value }}));
-            const color = d3.scaleOrdinal()
-              .domain(data.map(d => d.label))
-              .range(data.map(d => payload.colors[d.label] || "#94a3b8"));
-            const pie = d3.pie().value(d => d.value).sort(null);
-            const arc = d3.arc().innerRadius(0).outerRadius(radius);
-            const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
-            const g = svg.append("g").attr("transform", "translate(" + width / 2 + "," + height / 2 + ")");
-            g.selectAll("path")
-              .data(pie(data))
-              .enter()
-              .append("path")
-              .attr("d", arc)
-              .attr("fill", d => color(d.data.label))
-              .attr("stroke", "#fff")
-              .attr("stroke-width", 1)
-              .on("mouseover", (event, d) => {{
-                const total = d3.sum(data, i => i.value) || 1;
-                const pct = (d.data.value / total) * 100;
-                tooltip.style("opacity", 1)
-                  .html("<strong>" + d.data.label + "</strong><br/>" + d3.format(",.0f")(d.data.value) + " kWh<br/>" + d3.format(".1f")(pct) + "%")
-                  .style("left", (event.pageX + 10) + "px")
-                  .style("top", (event.pageY - 28) + "px");
-              }})
-              .on("mouseout", () => tooltip.style("opacity", 0));
-
-            data.forEach(d => {{
-              const item = document.createElement("div");
-              item.className = "legend-item";
-              item.innerHTML = '<div class="legend-color" style="background:' + color(d.label) + '"></div><span>' + d.label + '</span>';
-              legend.appendChild(item);
-            }});
-          }}
-        </script>
-      </body>
-    </html>
-    """
-    return dedent(html)
+    return _d3_card_html(
+        title,
+        '<div id="pie" class="chart" style="height: 240px"></div>'
+        '<div id="legend" class="legend"></div>',
+        f"""{_PIE_JS}
+      renderPie(
+        document.getElementById("pie"),
+        document.getElementById("legend"),
+        tooltip,
+        {data_json},
+      );""",
+    )
 
 
 def create_monthly_timeseries_d3_html(
@@ -605,106 +717,86 @@ def create_monthly_timeseries_d3_html(
         "y_label": y_label,
     }
     data_json = json.dumps(payload, ensure_ascii=False)
-    html = f"""
-    <!doctype html>
-    <html lang="en">
-      <head>
-        <meta charset="utf-8" />
-        <title>{title}</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <style>
-          body {{ font-family: system-ui, sans-serif; margin: 0; padding: 0.5rem; }}
-          .chart {{ width: 100%; height: 300px; }}
-          .legend {{ display: flex; flex-wrap: wrap; gap: 0.5rem; font-size: 0.75rem; margin-top: 0.5rem; }}
-          .legend-item {{ display: flex; align-items: center; gap: 0.4rem; }}
-          .legend-color {{ width: 12px; height: 12px; border-radius: 2px; }}
-          .axis-label {{ fill: #4b5563; font-size: 11px; }}
-          .tooltip {{
-            position: absolute;
-            background: #111827;
-            color: #e5e7eb;
-            padding: 0.35rem 0.55rem;
-            border-radius: 0.5rem;
-            font-size: 0.75rem;
-            pointer-events: none;
-            z-index: 1000;
-          }}
-        </style>
-        <script src="https://d3js.org/d3.v7.min.js"></script>
-      </head>
-      <body>
-        <div id="chart" class="chart"></div>
-        <div id="legend" class="legend"></div>
-        <script>
-          const payload = {data_json};
-          const data = payload.records || [];
-          const meters = payload.meters || [];
-          const colors = payload.colors || {{}};
-          const monthNames = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"];
-          const container = document.getElementById("chart");
-          const legend = document.getElementById("legend");
-          const tooltip = d3.select("body").append("div").attr("class", "tooltip").style("opacity", 0);
-          if (!data.length) {{
-            container.innerHTML = "no data available";
-          }} else {{
-            const width = container.clientWidth || 480;
-            const height = 300;
-            const margin = {{ top: 20, right: 20, bottom: 40, left: 52 }};
-            const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
-            const chartWidth = width - margin.left - margin.right;
-            const chartHeight = height - margin.top - margin.bottom;
-            const g = svg.append("g").attr("transform", "translate(" + margin.left + "," + margin.top + ")");
-            const x = d3.scaleBand().domain(d3.range(1, 13)).range([0, chartWidth]).padding(0.1);
-            const y = d3.scaleLinear()
-              .domain([0, d3.max(data, d => d.avg) || 1])
-              .nice()
-              .range([chartHeight, 0]);
-            const area = d3.area()
-              .x(d => x(d.month) + x.bandwidth() / 2)
-              .y0(d => y(d.ci_low))
-              .y1(d => y(d.ci_high))
-              .curve(d3.curveMonotoneX);
-            const line = d3.line()
-              .x(d => x(d.month) + x.bandwidth() / 2)
-              .y(d => y(d.avg))
-              .curve(d3.curveMonotoneX);
-            meters.forEach((meter, idx) => {{
-              const series = data.filter(d => d.meter === meter).sort((a, b) => a.month - b.month);
-              if (!series.length) return;
-              const color = colors[meter] || d3.schemeCategory10[idx % 10];
-              g.append("path").datum(series).attr("d", area).attr("fill", color).attr("opacity", 0.15);
-              g.append("path").datum(series).attr("d", line).attr("stroke", color).attr("fill", "none").attr("stroke-width", 2).attr("opacity", 0.85);
-              g.selectAll("circle." + meter.replace(/\\s+/g, "-"))
-                .data(series)
-                .enter()
-                .append("circle")
-                .attr("cx", d => x(d.month) + x.bandwidth() / 2)
-                .attr("cy", d => y(d.avg))
-                .attr("r", 3)
-                .attr("fill", color)
-                .attr("opacity", 0.9)
-                .on("mouseover", (event, d) => {{
-                  tooltip.style("opacity", 1)
-                    .html("<strong>" + meter + "</strong><br/>month: " + monthNames[d.month - 1] + "<br/>avg: " + d3.format(",.2f")(d.avg))
-                    .style("left", (event.pageX + 10) + "px")
-                    .style("top", (event.pageY - 28) + "px");
-                }})
-                .on("mouseout", () => tooltip.style("opacity", 0));
-              const item = document.createElement("div");
-              item.className = "legend-item";
-              item.innerHTML = '<div class="legend-color" style="background:' + color + '"></div><span>' + meter + '</span>';
-              legend.appendChild(item);
-            }});
-            g.append("g").attr("transform", "translate(0," + chartHeight + ")").call(d3.axisBottom(x).tickFormat((d, i) => monthNames[i]));
-            g.append("g").call(d3.axisLeft(y).ticks(6));
-            svg.append("text").attr("class", "axis-label").attr("text-anchor", "middle").attr("x", margin.left + chartWidth / 2).attr("y", height - 8).text("month");
-            svg.append("text").attr("class", "axis-label").attr("text-anchor", "middle").attr("transform", "rotate(-90)").attr("x", -(margin.top + chartHeight / 2)).attr("y", 16).text(payload.y_label || "");
-          }}
-        </script>
-      </body>
-    </html>
+    return _d3_card_html(
+        title,
+        '<div id="chart" class="chart" style="height: 300px"></div>'
+        '<div id="legend" class="legend"></div>',
+        f"""{_MONTHLY_TIMESERIES_JS}
+      renderMonthlyTimeseries(
+        document.getElementById("chart"),
+        document.getElementById("legend"),
+        tooltip,
+        {data_json},
+      );""",
+    )
+
+
+def create_results_dashboard_d3_html(d3_data: dict[str, Any]) -> str:
+    """Build the Results summary (two histograms, two pies, two timeseries) as one page.
+
+    Rendering all six charts in one document loads d3 and parses the data once,
+    instead of once per iframe.
+
+    Args:
+        d3_data: Output of `results_data.extract_d3_data`.
     """
-    return dedent(html)
+    payload = {
+        "eui": _histogram_payload(d3_data["eui"], "EUI (kWh/m2)"),
+        "peak": _histogram_payload(d3_data["peak"], "Peak (kW/m2)"),
+        "end_uses_total": {
+            "values": d3_data["end_uses_total"],
+            "colors": d3_data["end_use_colors"],
+        },
+        "utilities_total": {
+            "values": d3_data["utilities_total"],
+            "colors": d3_data["fuel_colors"],
+        },
+        "monthly_end_uses": {
+            "records": d3_data["monthly_end_uses"],
+            "meters": d3_data["end_use_meters"],
+            "colors": d3_data["end_use_colors"],
+            "y_label": "EUI (kWh/m2)",
+        },
+        "monthly_fuels": {
+            "records": d3_data["monthly_fuels"],
+            "meters": d3_data["fuel_meters"],
+            "colors": d3_data["fuel_colors"],
+            "y_label": "EUI (kWh/m2)",
+        },
+    }
+    data_json = json.dumps(payload, ensure_ascii=False)
+    body = """
+    <h2>EUI Distribution</h2>
+    <div id="eui" class="chart" style="height: 260px"></div>
+    <h2>Peak Distribution</h2>
+    <div id="peak" class="chart" style="height: 260px"></div>
+    <h2>End Uses and Utilities Share</h2>
+    <div class="columns">
+      <div><h3>End Uses Share</h3><div id="end-uses" class="chart" style="height: 240px"></div><div id="end-uses-legend" class="legend"></div></div>
+      <div><h3>Utilities Share</h3><div id="utilities" class="chart" style="height: 240px"></div><div id="utilities-legend" class="legend"></div></div>
+    </div>
+    <h2>Monthly EUI by End Use</h2>
+    <div id="monthly-end-uses" class="chart" style="height: 300px"></div>
+    <div id="monthly-end-uses-legend" class="legend"></div>
+    <h2>Monthly EUI by Utility</h2>
+    <div id="monthly-fuels" class="chart" style="height: 300px"></div>
+    <div id="monthly-fuels-legend" class="legend"></div>
+    """
+    script = f"""{_HISTOGRAM_JS}{_PIE_JS}{_MONTHLY_TIMESERIES_JS}
+      const payload = {data_json};
+      const el = id => document.getElementById(id);
+      renderHistogram(el("eui"), tooltip, payload.eui);
+      renderHistogram(el("peak"), tooltip, payload.peak);
+      renderPie(el("end-uses"), el("end-uses-legend"), tooltip, payload.end_uses_total);
+      renderPie(el("utilities"), el("utilities-legend"), tooltip, payload.utilities_total);
+      renderMonthlyTimeseries(el("monthly-end-uses"), el("monthly-end-uses-legend"), tooltip, payload.monthly_end_uses);
+      renderMonthlyTimeseries(el("monthly-fuels"), el("monthly-fuels-legend"), tooltip, payload.monthly_fuels);"""
+    css = """
+h2 { font-size: 1.25rem; font-weight: 600; margin: 1.25rem 0 0.5rem 0; }
+h3 { font-size: 1rem; font-weight: 600; margin: 0 0 0.25rem 0; }
+.columns { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
+"""
+    return _d3_card_html("Results Summary", body, script, css)
 
 
 # ---------------------------------------------------------------------------
@@ -712,6 +804,27 @@ def create_monthly_timeseries_d3_html(
 # ---------------------------------------------------------------------------
 
 
+@cache
+def _compact_deck_type() -> type[pdk.Deck]:
+    """A pydeck Deck subclass whose JSON spec is written without indentation.
+
+    Streamlit sends `Deck.to_json()` to the browser, and pydeck indents it, which
+    makes `json` fall back to its pure-Python encoder and inflates the payload
+    with whitespace for every vertex.
+    """
+    import pydeck as pdk
+    from pydeck.bindings.json_tools import default_serialize
+
+    class CompactDeck(pdk.Deck):
+        def to_json(self) -> str:
+            """Return the Deck spec as compact JSON."""
+            return json.dumps(
+                self, sort_keys=True, default=default_serialize, separators=(",", ":")
+            )
+
+    return CompactDeck
+
+
 def create_column_layer_chart(
     df: pd.DataFrame,
     value_col: str | tuple[str, ...],
@@ -727,20 +840,36 @@ def create_column_layer_chart(
     Returns:
         pdk.Deck object ready for rendering.
     """
+    import pydeck as pdk
+
     config = config or Building3DConfig()
 
-    df_map = df.dropna(subset=[LAT_COL, LON_COL, value_col]).copy()
-    if df_map.empty:
+    # Only lat/lon, the metric (for the tooltip) and the height go to pydeck, so
+    # build that small frame from arrays rather than copying the whole input.
+    valid = df[[LAT_COL, LON_COL, value_col]].notna().all(axis=1).to_numpy()
+    if not valid.any():
         msg = "No valid rows with lat/lon and metric"
         raise ValueError(msg)
 
-    vals = df_map[value_col].astype("float64")
-    q_low, q_high = vals.quantile([0.05, 0.95])
-    clipped = vals.clip(q_low, q_high)
-    df_map["__height__"] = clipped - clipped.min() + 1.0
-
-    center_lat = float(df_map[LAT_COL].mean())
-    center_lon = float(df_map[LON_COL].mean())
+    vals = df[value_col].to_numpy(dtype="float64")[valid]
+    q_low, q_high = np.quantile(vals, [0.05, 0.95])
+    heights = np.clip(vals, q_low, q_high)
+    heights -= heights.min()
+    heights += 1.0
+
+    lat = df[LAT_COL].to_numpy(dtype="float64")[valid]
+    lon = df[LON_COL].to_numpy(dtype="float64")[valid]
+    df_map = pd.DataFrame({
+        # ~0.1 m precision; shorter numbers in the JSON sent to the browser.
+        LAT_COL: np.round(lat, 6),
+        LON_COL: np.round(lon, 6),
+        value_col: df[value_col].to_numpy()[valid],
+        # Elevations only need to be distinguishable on screen.
+        "__height__": _display_precision(heights),
+    })
+
+    center_lat = float(lat.mean())
+    center_lon = float(lon.mean())
 
     layer = pdk.Layer(
         "ColumnLayer",
@@ -767,22 +896,28 @@ def create_column_layer_chart(
         "style": {"backgroundColor": "black", "color": "white"},
     }
 
-    return pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip=tooltip)  # type: ignore[arg-type]
+    return _compact_deck_type()(
+        layers=[layer],
+        initial_view_state=view_state,
+        tooltip=tooltip,  # type: ignore[arg-type]
+    )
 
 
 def create_polygon_layer_chart(
-    features: list[dict[str, Any]],
+    features: pd.DataFrame,
     config: Building3DConfig | None = None,
 ) -> pdk.Deck:
     """Create a pydeck polygon layer chart for rotated building footprints.
 
     Args:
-        features: List of dicts with 'polygon' and 'height' keys.
+        features: DataFrame with 'polygon' and 'height' columns.
         config: Optional configuration for the chart.
 
     Returns:
         pdk.Deck object ready for rendering.
     """
+    import pydeck as pdk
+
     config = config or Building3DConfig()
 
     layer = pdk.Layer(
@@ -811,7 +946,7 @@ def create_polygon_layer_chart(
         "style": {"backgroundColor": "black", "color": "white"},
     }
 
-    return pdk.Deck(
+    return _compact_deck_type()(
         layers=[layer],
         initial_view_state=view_state,
         tooltip=tooltip,
@@ -822,6 +957,9 @@ def create_polygon_layer_chart(
 
 def load_rotated_polygon(wkt_value: str) -> list[tuple[float, float]] | None:
     """Load a polygon from WKT string and return exterior coords."""
+    from shapely import wkt as shapely_wkt
+    from shapely.geometry import MultiPolygon, Polygon
+
     try:
         geom = shapely_wkt.loads(wkt_value)
     except Exception:
@@ -841,24 +979,18 @@ def load_rotated_polygon(wkt_value: str) -> list[tuple[float, float]] | None:
     return [(float(x), float(y)) for x, y in coords]
 
 
-def compute_cartesian_offsets(
-    offsets: list[tuple[float, float]],
-) -> list[tuple[float, float]]:
-    """Project lat/lon offsets to local cartesian plane."""
-    lat0 = sum(lat for _, lat in offsets) / len(offsets)
-    lon0 = sum(lon for lon, _ in offsets) / len(offsets)
+def compute_cartesian_offsets(offsets: np.ndarray) -> np.ndarray:
+    """Project an (N, 2) array of lon/lat offsets to the local cartesian plane."""
+    lon0, lat0 = offsets.mean(axis=0)
     meters_per_deg_lat = 110540.0
     meters_per_deg_lon = 111320.0 * math.cos(math.radians(lat0))
-    return [
-        ((lon - lon0) * meters_per_deg_lon, (lat - lat0) * meters_per_deg_lat)
-        for lon, lat in offsets
-    ]
+    return (offsets - (lon0, lat0)) * (meters_per_deg_lon, meters_per_deg_lat)
 
 
 def extract_building_polygons(
     df: pd.DataFrame,
     height_col: str = "height",
-) -> list[dict[str, Any]]:
+) -> pd.DataFrame:
     """Extract polygon features from dataframe with rotated rectangles.
 
     Args:
@@ -866,8 +998,11 @@ def extract_building_polygons(
         height_col: Column to use for building heights.
 
     Returns:
-        List of feature dicts for pydeck polygon layer.
+        DataFrame with 'polygon' (vertex lists) and 'height' columns for the
+        pydeck polygon layer; empty if no valid polygons were found.
     """
+    import shapely
+
     df_reset = df.reset_index()
 
     if ROTATED_RECTANGLE_COL not in df_reset.columns:
@@ -878,50 +1013,107 @@ def extract_building_polygons(
         msg = "No lat/lon columns found"
         raise ValueError(msg)
 
-    rect_series = df_reset[ROTATED_RECTANGLE_COL]
-    height_series = (
-        df_reset[height_col].astype("float64")
-        if height_col in df_reset.columns
-        else None
+    rects = df_reset[ROTATED_RECTANGLE_COL]
+    if rects.dtype.name == "geometry":
+        # A geopandas geometry column already holds shapely objects (or None).
+        geoms = rects.to_numpy()
+    elif isinstance(rects.dtype, pd.StringDtype):
+        geoms = shapely.from_wkt(
+            rects.to_numpy(dtype=object, na_value=None), on_invalid="ignore"
+        )
+    else:
+        # Mixed object column: parse the strings, keep geometries, drop the rest.
+        raw = rects.to_numpy(dtype=object)
+        is_str = np.fromiter((isinstance(v, str) for v in raw), bool, len(raw))
+        geoms = np.where(
+            np.fromiter((isinstance(v, shapely.Geometry) for v in raw), bool, len(raw)),
+            raw,
+            None,
+        )
+        geoms[is_str] = shapely.from_wkt(raw[is_str], on_invalid="ignore")
+
+    type_ids = shapely.get_type_id(geoms)
+    rows = np.flatnonzero(
+        (
+            (type_ids == shapely.GeometryType.POLYGON)
+            | (type_ids == shapely.GeometryType.MULTIPOLYGON)
+        )
+        & ~shapely.is_empty(geoms)
     )
+    if rows.size == 0:
+        return pd.DataFrame({"polygon": [], "height": []})
+
+    # Keep the largest part of each geometry (a polygon is its own only part).
+    parts, owner = shapely.get_parts(geoms[rows], return_index=True)
+    order = np.lexsort((-shapely.area(parts), owner))
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = owner[order][1:] != owner[order][:-1]
+    polygons = parts[order[first]]
+    rows = rows[owner[order[first]]]
+
+    # One (V, 2) buffer of exterior vertices for all polygons, centred on each
+    # polygon's area centroid.
+    coords, ring_ix = shapely.get_coordinates(
+        shapely.get_exterior_ring(polygons), return_index=True
+    )
+    counts = np.bincount(ring_ix, minlength=len(polygons))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    centroids = shapely.get_coordinates(shapely.centroid(polygons))
 
-    polygons: list[list[tuple[float, float]]] = []
-    heights: list[float] = []
-    offsets: list[tuple[float, float]] = []
-
-    for i, wkt_value in enumerate(rect_series):
-        if hasattr(wkt_value, "wkt"):
-            wkt_value = wkt_value.wkt
-        if not isinstance(wkt_value, str):
-            continue
-
-        coords = load_rotated_polygon(wkt_value)
-        if not coords:
-            continue
-
-        xs = [p[0] for p in coords]
-        ys = [p[1] for p in coords]
-        centroid_x = sum(xs) / len(xs)
-        centroid_y = sum(ys) / len(ys)
-        normalized = [(x - centroid_x, y - centroid_y) for x, y in coords]
+    heights = (
+        df_reset[height_col].to_numpy(dtype="float64")[rows]
+        if height_col in df_reset.columns
+        else np.full(rows.size, 10.0)
+    )
+    offsets_xy = compute_cartesian_offsets(
+        df_reset[["lon", "lat"]].to_numpy(dtype="float64")[rows]
+    )
 
-        height = 10.0 if height_series is None else float(height_series.iloc[i])
-        lat = float(df_reset.iloc[i]["lat"])
-        lon = float(df_reset.iloc[i]["lon"])
+    # Centimetre precision is plenty for footprints and keeps the JSON that
+    # pydeck ships to the browser short.
+    shifted = np.round(coords - centroids[ring_ix] + offsets_xy[ring_ix], 2)
+    if (counts == counts[0]).all():
+        # Rotated rectangles all have the same ring length: one C-level tolist.
+        polygons_xy = shifted.reshape(len(counts), counts[0], 2).tolist()
+    else:
+        vertices = shifted.tolist()
+        ends = (starts + counts).tolist()
+        polygons_xy = [
+            vertices[s:e] for s, e in zip(starts.tolist(), ends, strict=True)
+        ]
+    return pd.DataFrame({"polygon": polygons_xy, "height": heights})
 
-        polygons.append(normalized)
-        heights.append(height)
-        offsets.append((lon, lat))
 
-    if not polygons:
-        return []
+def build_polygon_features(
+    df: pd.DataFrame,
+    locations_df: pd.DataFrame,
+    height_col: str = "height",
+) -> pd.DataFrame | None:
+    """Join output data to building locations and extract footprint polygons.
 
-    offsets_xy = compute_cartesian_offsets(offsets)
+    Equivalent to `merge_with_building_locations` followed by
+    `extract_building_polygons`, but only the id, footprint, height and any
+    lat/lon columns are carried through the join instead of every output column.
 
-    features: list[dict[str, Any]] = []
-    for idx, polygon in enumerate(polygons):
-        offset_x, offset_y = offsets_xy[idx]
-        shifted = [[x + offset_x, y + offset_y] for x, y in polygon]
-        features.append({"polygon": shifted, "height": heights[idx]})
+    Args:
+        df: Output dataframe with BUILDING_ID_COL and ROTATED_RECTANGLE_COL.
+        locations_df: Locations dataframe with BUILDING_ID_COL, lat, lon.
+        height_col: Column to use for building heights.
 
-    return features
+    Returns:
+        Polygon features as from `extract_building_polygons`, or None if no
+        building ids match.
+    """
+    wanted = [BUILDING_ID_COL, ROTATED_RECTANGLE_COL, LAT_COL, LON_COL, height_col]
+    columns = {}
+    for col in dict.fromkeys(wanted):
+        # A named single index is a column to the merge (it resets the index).
+        if df.index.name is not None and col == df.index.name:
+            columns[col] = df.index.to_numpy()
+        elif col in df.columns:
+            columns[col] = df[col].to_numpy()
+
+    merged = merge_with_building_locations(pd.DataFrame(columns), locations_df)
+    if merged is None:
+        return None
+    return extract_building_polygons(merged, height_col)
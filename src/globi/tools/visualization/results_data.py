@@ -5,6 +5,7 @@ from __future__ import annotations
 import json
 from textwrap import dedent
 
+import numpy as np
 import pandas as pd
 
 
@@ -33,29 +34,37 @@ def _extract_monthly_timeseries(df: pd.DataFrame, aggregation: str) -> list[dict
     subset = numeric_df.loc[:, mask]
     if subset.empty:
         return []
-    data = []
-    for meter in subset.columns.get_level_values("Meter").unique():
-        for month in subset.columns.get_level_values("Month").unique():
-            col_mask = (subset.columns.get_level_values("Meter") == meter) & (
-                subset.columns.get_level_values("Month") == month
-            )
-            if col_mask.any():
-                values = subset.loc[:, col_mask].iloc[:, 0]
-                n = len(values)
-                std = float(values.std(ddof=1)) if n > 1 else 0.0
-                sem = std / (n**0.5) if n > 0 else 0.0
-                half_width = 1.96 * sem
-                mean_val = float(values.mean())
-                data.append({
-                    "month": int(month),
-                    "meter": str(meter),
-                    "avg": mean_val,
-                    "min": float(values.min()),
-                    "max": float(values.max()),
-                    "ci_low": mean_val - half_width,
-                    "ci_high": mean_val + half_width,
-                })
-    return data
+
+    # Reduce every (meter, month) column in one pass per statistic rather than
+    # scanning the column index once per pair.
+    meters = subset.columns.get_level_values("Meter")
+    months = subset.columns.get_level_values("Month")
+    meter_codes, _ = pd.factorize(meters)
+    month_codes, month_uniques = pd.factorize(months)
+    # First column of each pair, ordered by meter then month of first appearance.
+    _, firsts = np.unique(
+        meter_codes * len(month_uniques) + month_codes, return_index=True
+    )
+
+    n = len(subset)
+    avg = subset.mean().to_numpy()
+    mins = subset.min().to_numpy()
+    maxs = subset.max().to_numpy()
+    half_width = (
+        1.96 * subset.std(ddof=1).to_numpy() / n**0.5 if n > 1 else np.zeros(len(avg))
+    )
+    return [
+        {
+            "month": int(months[i]),
+            "meter": str(meters[i]),
+            "avg": float(avg[i]),
+            "min": float(mins[i]),
+            "max": float(maxs[i]),
+            "ci_low": float(avg[i] - half_width[i]),
+            "ci_high": float(avg[i] + half_width[i]),
+        }
+        for i in firsts
+    ]
 
 
 def _compute_eui_and_peak(
@@ -139,6 +148,27 @@ def is_results_format(df: pd.DataFrame) -> bool:
     return names == ["Measurement", "Aggregation", "Meter", "Month"]
 
 
+# (Measurement, Aggregation) groups read by `extract_d3_data`.
+SUMMARY_COLUMN_GROUPS = (
+    ("Energy", "End Uses"),
+    ("Energy", "Utilities"),
+    ("Peak", "Raw"),
+)
+
+
+def summary_columns(df: pd.DataFrame) -> list[tuple[str, ...]] | None:
+    """Column labels of a Results.pq-style frame that the summary views read.
+
+    `df` only needs the columns, so an empty schema frame works. Returns None
+    when every column is needed anyway.
+    """
+    measurement = df.columns.get_level_values("Measurement")
+    aggregation = df.columns.get_level_values("Aggregation")
+    groups = pd.MultiIndex.from_arrays([measurement, aggregation])
+    mask = groups.isin(SUMMARY_COLUMN_GROUPS)
+    return None if mask.all() else list(df.columns[mask])
+
+
 def extract_d3_data(
     df: pd.DataFrame,
     region_name: str = "",
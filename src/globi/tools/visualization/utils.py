@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import os
 from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
+from typing import IO
 
+import numpy as np
 import pandas as pd
 
 # TODO: update this after the building col PR merged
@@ -51,21 +54,50 @@ class OverHeatingUseCase:
 RESULTS_PQ_NAME = "Results.pq"
 
 
-def find_output_run_dirs(base_dir: Path | str) -> list[Path]:
+def find_output_run_dirs(
+    base_dir: Path | str, max_depth: int | None = None
+) -> list[Path]:
     """Find directories under base_dir that contain at least one .pq file.
 
+    The tree is walked with `os.scandir`, whose entries carry their file type.
+    Symlinked directories are followed like `Path.rglob` does, except when they
+    point at a directory already seen, so links back up the tree do not loop. `max_depth` bounds
+    how many directory levels below base_dir are searched; `None` searches the
+    whole tree.
+
     Returns sorted list of directory paths (run folders, e.g. TestRegion/dryrun/Baseline/v1.0.0).
     """
     root = Path(base_dir)
-    if not root.exists():
+    if not root.is_dir():
         return []
 
     # TODO: update this depending on the method for accessing runs
-    seen: set[Path] = set()
-    for path in root.rglob("*.pq"):
-        if path.is_file():
-            seen.add(path.parent)
-    return sorted(seen)
+    found: list[Path] = []
+    root_stat = root.stat()
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+    stack: list[tuple[str, int]] = [(str(root), 0)]
+    while stack:
+        dir_path, depth = stack.pop()
+        has_pq = False
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if max_depth is not None and depth >= max_depth:
+                            continue
+                        dir_stat = entry.stat()
+                        dir_id = (dir_stat.st_dev, dir_stat.st_ino)
+                        if entry.is_symlink() and dir_id in visited:
+                            continue
+                        visited.add(dir_id)
+                        stack.append((entry.path, depth + 1))
+                    elif not has_pq and entry.name.endswith(".pq") and entry.is_file():
+                        has_pq = True
+        except OSError:
+            continue
+        if has_pq:
+            found.append(Path(dir_path))
+    return sorted(found)
 
 
 def get_pq_file_for_run(run_dir: Path) -> Path | None:
@@ -77,14 +109,67 @@ def get_pq_file_for_run(run_dir: Path) -> Path | None:
     return pq_files[0] if pq_files else None
 
 
-def load_output_table(path: Path | str) -> pd.DataFrame:
-    """Load a .pq (parquet) file into a dataframe. Uses pandas; Results.pq has no geometry."""
+def load_output_table(
+    path: Path | str, columns: list[str] | list[tuple[str, ...]] | None = None
+) -> pd.DataFrame:
+    """Load a .pq (parquet) file into a dataframe. Results.pq has no geometry."""
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(p)
     if p.suffix != ".pq":
         raise ValueError("unsupported")
-    return pd.read_parquet(p)
+    return read_parquet_frame(p, columns=columns)
+
+
+def read_parquet_frame(
+    source: Path | IO[bytes], columns: list[str] | list[tuple[str, ...]] | None = None
+) -> pd.DataFrame:
+    """Read parquet data from a path or binary buffer into a dataframe.
+
+    Only the requested columns (plus the stored index) are read when `columns` is
+    given, and the arrow buffers are released as they are handed to pandas.
+    MultiIndex column labels are given as tuples, as they appear in the dataframe.
+    """
+    import pyarrow.parquet as pq
+
+    if columns is not None and any(isinstance(c, tuple) for c in columns):
+        columns = _parquet_field_names(source, columns)
+    table = pq.read_table(source, columns=columns, use_pandas_metadata=True)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _parquet_field_names(
+    source: Path | IO[bytes], labels: list[str] | list[tuple[str, ...]]
+) -> list[str]:
+    """Map dataframe column labels to the parquet fields pandas stored them under.
+
+    Tuple labels are stored as their string form, but level values may not
+    round-trip exactly (e.g. months come back as ints), so fields are matched to
+    labels by position in the schema rather than by formatting the label.
+    """
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(source)
+    if not isinstance(source, Path):
+        source.seek(0)  # read_schema consumed the buffer
+    index_fields = {
+        c
+        for c in (schema.pandas_metadata or {}).get("index_columns", [])
+        if isinstance(c, str)
+    }
+    fields = [name for name in schema.names if name not in index_fields]
+    by_label = dict(zip(schema.empty_table().to_pandas().columns, fields, strict=True))
+    return [by_label.get(label, str(label)) for label in labels]
+
+
+def read_parquet_schema(path: Path | str) -> pd.DataFrame:
+    """Return an empty dataframe with the columns, dtypes and index names of a parquet file.
+
+    Only the file footer is read, so this is cheap even for large outputs.
+    """
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(path).empty_table().to_pandas()
 
 
 def require_geo_columns(df: pd.DataFrame) -> tuple[str, str]:
@@ -160,10 +245,52 @@ def merge_with_building_locations(
     if BUILDING_ID_COL not in locations_df.columns:
         return None
 
-    loc_subset = locations_df[[BUILDING_ID_COL, LAT_COL, LON_COL]].dropna()
-    merged = df_reset.merge(loc_subset, on=BUILDING_ID_COL, how="inner")
+    loc_index, lats, lons = _location_lookup(locations_df)
+    if not loc_index.is_unique or LAT_COL in df_reset or LON_COL in df_reset:
+        # Keep merge's row expansion and suffixing for these cases.
+        loc_subset = pd.DataFrame({
+            BUILDING_ID_COL: loc_index,
+            LAT_COL: lats,
+            LON_COL: lons,
+        })
+        merged = df_reset.merge(loc_subset, on=BUILDING_ID_COL, how="inner")
+        return merged if not merged.empty else None
+
+    # Look each building up in the locations index instead of hash-joining.
+    positions = loc_index.get_indexer(df_reset[BUILDING_ID_COL])
+    matched = positions >= 0
+    if not matched.any():
+        return None
+    positions = positions[matched]
+    merged = df_reset.iloc[matched].reset_index(drop=True)
+    merged[LAT_COL] = lats[positions]
+    merged[LON_COL] = lons[positions]
+    return merged
+
+
+# The last locations frame seen and its id index / lat / lon arrays. Data sources
+# hand back the same frame until the file changes, so the index's hash table is
+# built once rather than on every rerun.
+_last_location_lookup: tuple[pd.DataFrame, pd.Index, np.ndarray, np.ndarray] | None = (
+    None
+)
+
 
-    return merged if not merged.empty else None
+def _location_lookup(
+    locations_df: pd.DataFrame,
+) -> tuple[pd.Index, np.ndarray, np.ndarray]:
+    """Index building ids of the rows with a known location, reusing the last build."""
+    global _last_location_lookup
+    cached = _last_location_lookup
+    if cached is not None and cached[0] is locations_df:
+        return cached[1], cached[2], cached[3]
+
+    loc_subset = locations_df[[BUILDING_ID_COL, LAT_COL, LON_COL]].dropna()
+    loc_index = pd.Index(loc_subset[BUILDING_ID_COL])
+    lats = loc_subset[LAT_COL].to_numpy()
+    lons = loc_subset[LON_COL].to_numpy()
+    _last_location_lookup = (locations_df, loc_index, lats, lons)
+    return loc_index, lats, lons
 
 
 def compute_scenario_comparison(
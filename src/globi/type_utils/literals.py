@@ -10,24 +10,24 @@ BasementAtticOccupationConditioningStatus = Literal[
     "occupied_conditioned",
 ]
 
-OccupiedOptions: list[BasementAtticOccupationConditioningStatus] = [
+OccupiedOptions: frozenset[BasementAtticOccupationConditioningStatus] = frozenset((
     "occupied_unconditioned",
     "occupied_conditioned",
-]
+))
 
-UnoccupiedOptions: list[BasementAtticOccupationConditioningStatus] = [
+UnoccupiedOptions: frozenset[BasementAtticOccupationConditioningStatus] = frozenset((
     "none",
     "unoccupied_unconditioned",
     "unoccupied_conditioned",
-]
+))
 
-ConditionedOptions: list[BasementAtticOccupationConditioningStatus] = [
+ConditionedOptions: frozenset[BasementAtticOccupationConditioningStatus] = frozenset((
     "occupied_conditioned",
     "unoccupied_conditioned",
-]
+))
 
-UnconditionedOptions: list[BasementAtticOccupationConditioningStatus] = [
+UnconditionedOptions: frozenset[BasementAtticOccupationConditioningStatus] = frozenset((
     "none",
     "unoccupied_unconditioned",
     "occupied_unconditioned",
-]
+))
@@ -0,0 +1,28 @@
+"""YAML helpers for the GloBI project."""
+
+import logging
+from pathlib import Path
+from typing import IO, Any
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML was built without libyaml
+    from yaml import SafeLoader
+
+    logger.info(
+        "libyaml is not available; YAML parsing will use the slower pure-Python loader."
+    )
+
+
+def safe_load(stream: str | bytes | IO[str] | IO[bytes]) -> Any:
+    """Parse a YAML document with the libyaml safe loader when it is available."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_yaml_file(path: Path | str) -> Any:
+    """Read a YAML file as raw bytes and parse it with `safe_load`."""
+    return safe_load(Path(path).read_bytes())
@@ -0,0 +1,135 @@
+"""Tests for the globi CLI helpers."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("globi")
+pytest.importorskip("click")
+
+from globi.tools.cli.main import (
+    _resolve_latest_version,
+    _write_csv,
+    _write_simulation_result,
+)
+
+
+def _results_frame(index: pd.MultiIndex) -> pd.DataFrame:
+    columns = pd.MultiIndex.from_product(
+        [["Energy"], ["End Uses"], ["Heating", "Cooling"], [1, 2]],
+        names=["Measurement", "Aggregation", "Meter", "Month"],
+    )
+    values = np.arange(len(index) * len(columns), dtype=float).reshape(len(index), -1)
+    values[0, 0] = 1.5
+    return pd.DataFrame(values / 3, index=index, columns=columns)
+
+
+def test_write_csv_matches_pandas_with_string_and_bool_index(tmp_path):
+    """Non-numeric index levels are written exactly as pandas writes them."""
+    index = pd.MultiIndex.from_arrays(
+        [["a", "b, quoted", "c"], [True, False, True], [1.0, 2.0, 3.0]],
+        names=["building_id", "flag", "area"],
+    )
+    df = _results_frame(index)
+
+    _write_csv(df, tmp_path / "out.csv")
+    df.to_csv(tmp_path / "expected.csv")
+
+    assert (tmp_path / "out.csv").read_text() == (tmp_path / "expected.csv").read_text()
+
+
+def test_write_csv_numeric_frame_reads_back_like_pandas(tmp_path):
+    """All-numeric frames take the pyarrow path and round-trip to the same values."""
+    pytest.importorskip("pyarrow")
+    index = pd.MultiIndex.from_arrays(
+        [[0, 1, 2], [10.0, 20.5, np.nan]], names=["sort_index", "area"]
+    )
+    df = _results_frame(index)
+    df.iloc[1, 2] = np.nan
+
+    _write_csv(df, tmp_path / "out.csv")
+    df.to_csv(tmp_path / "expected.csv")
+
+    def read(name):
+        return pd.read_csv(tmp_path / name, header=[0, 1, 2, 3], index_col=[0, 1])
+
+    out, expected = read("out.csv"), read("expected.csv")
+    pd.testing.assert_frame_equal(out, expected)
+    with open(tmp_path / "out.csv") as f, open(tmp_path / "expected.csv") as g:
+        assert f.readlines()[:5] == g.readlines()[:5]
+
+
+class _FakeExperiment:
+    def __init__(self, run_name: str, version: str):
+        from scythe.experiments import SemVer
+
+        self.run_name = run_name
+        self.version = SemVer.FromString(version)
+        self.calls = 0
+
+    def latest_version(self, s3_client, from_cache: bool = True):
+        self.calls += 1
+        return SimpleNamespace(version=self.version)
+
+
+def test_latest_version_is_cached_on_disk_until_refresh(tmp_path, monkeypatch):
+    """A resolved latest version is reused across runs unless --refresh is given."""
+    pytest.importorskip("scythe.experiments")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    exp = _FakeExperiment("Region/Scenario", "v1.2.3")
+    assert str(_resolve_latest_version(exp, "bucket", None)) == "v1.2.3"
+    assert exp.calls == 1
+
+    # A new process only has the file on disk to go by.
+    exp = _FakeExperiment("Region/Scenario", "v1.2.4")
+    assert str(_resolve_latest_version(exp, "bucket", None)) == "v1.2.3"
+    assert exp.calls == 0
+
+    assert str(_resolve_latest_version(exp, "bucket", None, refresh=True)) == "v1.2.4"
+    assert exp.calls == 1
+    assert str(_resolve_latest_version(exp, "other-bucket", None)) == "v1.2.4"
+    assert exp.calls == 2
+
+
+def test_get_experiment_rejects_xlsx_for_keys_without_an_xlsx_export():
+    """Asking only for xlsx of e.g. HourlyData would otherwise write nothing."""
+    from click.testing import CliRunner
+
+    from globi.tools.cli.main import cli
+
+    args = ["--run-name", "run", "--dataframe-key", "HourlyData", "--format", "xlsx"]
+    result = CliRunner().invoke(cli, ["get", "experiment", *args])
+
+    assert result.exit_code == 2
+    assert "xlsx output is only available" in result.output
+
+
+def test_simulation_results_write_one_workbook_per_key(tmp_path):
+    """EnergyAndPeak and Results are written concurrently, so they need their own files."""
+    pytest.importorskip("xlsxwriter")
+    index = pd.MultiIndex.from_arrays([["a", "b"], [0, 1]], names=["id", "n"])
+    frames = {"EnergyAndPeak": _results_frame(index), "Results": _results_frame(index)}
+    frames["Results"] *= 2
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(
+            pool.map(
+                lambda kv: _write_simulation_result(
+                    kv[0], kv[1], tmp_path, ("xlsx",), "wide"
+                ),
+                frames.items(),
+            )
+        )
+
+    pytest.importorskip("openpyxl")
+    for key, df in frames.items():
+        sheet = pd.read_excel(tmp_path / f"{key}.xlsx", sheet_name=None)
+        assert list(sheet) == ["Energy_EndUses"]
+        heating = sheet["Energy_EndUses"]["Heating"].to_numpy()
+        np.testing.assert_allclose(
+            heating, df["Energy"]["End Uses"]["Heating"].stack().to_numpy()
+        )
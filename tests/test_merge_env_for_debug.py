@@ -0,0 +1,85 @@
+"""Tests for the debug env file merging script."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPT_PATH = (
+    Path(__file__).resolve().parent.parent / "scripts" / "merge_env_for_debug.py"
+)
+
+
+@pytest.fixture(scope="module")
+def script():
+    """Load the script as a module; scripts/ is not part of the package."""
+    spec = importlib.util.spec_from_file_location("merge_env_for_debug", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def parse_env_file(script):
+    """The script's env file parser."""
+    return script.parse_env_file
+
+
+def test_parse_env_file(tmp_path, parse_env_file):
+    """Comments and blank lines are skipped and keys and values are trimmed."""
+    env = tmp_path / ".env"
+    env.write_bytes(
+        b"# a comment\n"
+        b"\n"
+        b"   \n"
+        b"PLAIN=value\n"
+        b"  SPACED  =  padded value \t\n"
+        b"\t# indented comment\n"
+        b"URL=postgres://u:p@host/db?sslmode=require\n"
+        b"HASH=abc # not a comment\n"
+        b"EMPTY=\n"
+        b"no equals sign\n"
+        b"WINDOWS=crlf\r\n"
+        b"PLAIN=overridden\n"
+        b"UNICODE=caf\xc3\xa9\n"
+        b"LAST=no trailing newline"
+    )
+
+    assert parse_env_file(env) == {
+        "PLAIN": "overridden",
+        "SPACED": "padded value",
+        "URL": "postgres://u:p@host/db?sslmode=require",
+        "HASH": "abc # not a comment",
+        "EMPTY": "",
+        "WINDOWS": "crlf",
+        "UNICODE": "café",
+        "LAST": "no trailing newline",
+    }
+
+
+def test_parse_env_file_missing(tmp_path, parse_env_file):
+    """A missing env file contributes no variables."""
+    assert parse_env_file(tmp_path / ".env.missing") == {}
+
+
+def test_main_merges_env_files_in_order(tmp_path, monkeypatch, script):
+    """Later files override earlier ones and the old output is replaced whole."""
+    monkeypatch.setattr(script, "__file__", str(tmp_path / "scripts" / "merge.py"))
+    monkeypatch.setenv("AWS_ENV", "dev")
+    monkeypatch.delenv("HATCHET_ENV", raising=False)
+    (tmp_path / ".env.dev.aws").write_text("REGION=us-east-1\nBUCKET=aws\n")
+    (tmp_path / ".env.local.host.hatchet").write_text("TOKEN=secret\n")
+    (tmp_path / ".env.scythe.storage").write_text("BUCKET=scythe\n")
+    (tmp_path / ".env.debug").write_text("STALE=1\n" * 100)
+
+    script.main()
+
+    assert (tmp_path / ".env.debug").read_text() == (
+        "REGION=us-east-1\nBUCKET=scythe\nTOKEN=secret\n"
+    )
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        ".env.debug",
+        ".env.dev.aws",
+        ".env.local.host.hatchet",
+        ".env.scythe.storage",
+    ]
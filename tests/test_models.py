@@ -0,0 +1,73 @@
+"""Tests for the globi task models."""
+
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("epinterface")
+pytest.importorskip("scythe")
+
+from pydantic import ValidationError
+
+from globi.models.tasks import GloBIBuildingSpec, MinimalBuildingSpec
+
+
+def _minimal_spec(**kwargs) -> MinimalBuildingSpec:
+    return MinimalBuildingSpec(
+        db_file=Path("components.db"),
+        semantic_fields_file=Path("semantic_fields.yml"),
+        component_map_file=Path("component_map.yml"),
+        epwzip_file=Path("weather.epw.zip"),
+        semantic_field_context={"Typology": "Residential"},
+        **kwargs,
+    )
+
+
+def test_globi_spec_passes_validation():
+    """The spec built without validation must be one validation would accept."""
+    spec = _minimal_spec(length=10.0, width=20.0, num_floors=3, f2f_height=3.5)
+    globi_spec = spec.globi_spec
+
+    validated = GloBIBuildingSpec.model_validate(globi_spec.model_dump())
+    assert validated.model_dump() == globi_spec.model_dump()
+    assert globi_spec.long_edge == 20.0
+    assert globi_spec.short_edge == 10.0
+    assert globi_spec.height == pytest.approx(10.5)
+
+
+@pytest.mark.parametrize("frac", [0.0, 1.0])
+def test_minimal_spec_rejects_out_of_range_exposed_basement_frac(frac):
+    """Bounds match GloBIBuildingSpec, so globi_spec never sees an invalid value."""
+    with pytest.raises(ValidationError):
+        _minimal_spec(exposed_basement_frac=frac)
+
+
+def test_construct_zone_def_from_concurrent_threads():
+    """Workers run simulations on a thread pool; each call needs its own client."""
+    if shutil.which("prisma") is None:
+        pytest.skip("prisma executable not available")
+    data_dir = Path(__file__).parent / "data"
+    spec = _minimal_spec().model_copy(
+        update={
+            "db_file": data_dir / "components-lib.db",
+            "semantic_fields_file": data_dir / "semantic-fields.yml",
+            "component_map_file": data_dir / "component-map.yml",
+            "semantic_field_context": {
+                "Region": "TestRegion",
+                "Typology": "Residential",
+                "Age_bracket": "Post_2000",
+                "Scenario": "Baseline",
+                "Income": "Low",
+            },
+        }
+    )
+
+    def zone_def(_):
+        return spec.globi_spec.construct_zone_def().model_dump()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        zone_defs = list(pool.map(zone_def, range(6)))
+
+    assert all(z == zone_defs[0] for z in zone_defs)
@@ -0,0 +1,261 @@
+"""Tests for the visualization data helpers."""
+
+import os
+
+import pytest
+
+pytest.importorskip("globi")
+pytest.importorskip("streamlit")
+
+from globi.tools.visualization.utils import find_output_run_dirs
+
+
+def _touch_pq(path):
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "Results.pq").write_bytes(b"")
+
+
+def test_find_output_run_dirs_matches_rglob(tmp_path):
+    """Every directory holding a .pq file is found, at any depth."""
+    _touch_pq(tmp_path / "Region" / "dryrun" / "Baseline" / "v1.0.0")
+    _touch_pq(tmp_path / "Region" / "dryrun" / "Baseline" / "v1.1.0")
+    _touch_pq(tmp_path / "Other")
+    (tmp_path / "Empty" / "nested").mkdir(parents=True)
+    (tmp_path / "Empty" / "notes.txt").write_text("")
+
+    expected = sorted({p.parent for p in tmp_path.rglob("*.pq")})
+    assert find_output_run_dirs(tmp_path) == expected
+    assert find_output_run_dirs(tmp_path, max_depth=1) == [tmp_path / "Other"]
+    assert find_output_run_dirs(tmp_path / "missing") == []
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks unsupported")
+def test_find_output_run_dirs_follows_symlinks_without_looping(tmp_path):
+    """Linked run folders are found, and links back up the tree are not re-entered."""
+    outputs = tmp_path / "outputs"
+    elsewhere = tmp_path / "elsewhere"
+    _touch_pq(outputs / "Local")
+    _touch_pq(elsewhere / "Remote")
+    try:
+        (outputs / "linked").symlink_to(elsewhere, target_is_directory=True)
+        (outputs / "Local" / "loop").symlink_to(outputs, target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks here")
+
+    assert find_output_run_dirs(outputs) == [
+        outputs / "Local",
+        outputs / "linked" / "Remote",
+    ]
+
+
+def _results_frame(n_buildings: int = 3):
+    import numpy as np
+    import pandas as pd
+
+    columns = pd.MultiIndex.from_tuples(
+        [
+            ("Energy", "End Uses", "Lighting", 2),
+            ("Energy", "End Uses", "Heating", 1),
+            ("Energy", "End Uses", "Lighting", 1),
+            ("Energy", "End Uses", "Heating", 2),
+            ("Energy", "Utilities", "Electricity", 1),
+            ("Peak", "Raw", "Electricity", 1),
+            ("Peak", "Monthly", "Electricity", 1),
+        ],
+        names=["Measurement", "Aggregation", "Meter", "Month"],
+    )
+    index = pd.Index([f"b{i}" for i in range(n_buildings)], name="building_id")
+    values = np.arange(n_buildings * len(columns), dtype=float) ** 1.5
+    return pd.DataFrame(values.reshape(n_buildings, -1), index=index, columns=columns)
+
+
+def test_extract_monthly_timeseries_records():
+    """One record per (meter, month), meters then months by first appearance."""
+    from globi.tools.visualization.results_data import _extract_monthly_timeseries
+
+    df = _results_frame()
+    records = _extract_monthly_timeseries(df, "End Uses")
+
+    assert [(r["meter"], r["month"]) for r in records] == [
+        ("Lighting", 2),
+        ("Lighting", 1),
+        ("Heating", 2),
+        ("Heating", 1),
+    ]
+    for record in records:
+        values = df[("Energy", "End Uses", record["meter"], record["month"])]
+        half_width = 1.96 * values.std(ddof=1) / len(values) ** 0.5
+        assert record["avg"] == pytest.approx(values.mean())
+        assert record["min"] == values.min()
+        assert record["max"] == values.max()
+        assert record["ci_low"] == pytest.approx(values.mean() - half_width)
+        assert record["ci_high"] == pytest.approx(values.mean() + half_width)
+
+    single = _extract_monthly_timeseries(_results_frame(1), "Utilities")
+    assert single == [
+        {
+            "month": 1,
+            "meter": "Electricity",
+            "avg": single[0]["max"],
+            "min": single[0]["max"],
+            "max": single[0]["max"],
+            "ci_low": single[0]["max"],
+            "ci_high": single[0]["max"],
+        }
+    ]
+    assert _extract_monthly_timeseries(df, "Missing") == []
+
+
+def test_summary_columns_selects_summarised_groups():
+    """Only the groups extract_d3_data reads are loaded; None means all of them."""
+    from globi.tools.visualization.results_data import summary_columns
+
+    schema = _results_frame().iloc[:0]
+    assert summary_columns(schema) == [
+        ("Energy", "End Uses", "Lighting", 2),
+        ("Energy", "End Uses", "Heating", 1),
+        ("Energy", "End Uses", "Lighting", 1),
+        ("Energy", "End Uses", "Heating", 2),
+        ("Energy", "Utilities", "Electricity", 1),
+        ("Peak", "Raw", "Electricity", 1),
+    ]
+
+    summarised = schema.drop(columns=[("Peak", "Monthly", "Electricity", 1)])
+    assert summary_columns(summarised) is None
+
+
+def test_summary_columns_read_back_from_parquet(tmp_path):
+    """The selected labels load the same data as selecting from the full frame."""
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+
+    from globi.tools.visualization.results_data import summary_columns
+    from globi.tools.visualization.utils import load_output_table, read_parquet_schema
+
+    df = _results_frame()
+    path = tmp_path / "Results.pq"
+    df.to_parquet(path)
+
+    columns = summary_columns(read_parquet_schema(path))
+    loaded = load_output_table(path, columns=columns)
+    pd.testing.assert_frame_equal(loaded, df.loc[:, columns])
+
+
+def _reference_merge(df, locations_df):
+    loc = locations_df[["building_id", "lat", "lon"]].dropna()
+    return df.reset_index().merge(loc, on="building_id", how="inner")
+
+
+def test_merge_with_building_locations_matches_merge():
+    """The index lookup gives the same rows, order and values as an inner merge."""
+    import numpy as np
+    import pandas as pd
+
+    from globi.tools.visualization.utils import merge_with_building_locations
+
+    df = pd.DataFrame(
+        {"height": [3.0, 6.0, 9.0, 12.0]},
+        index=pd.Index(["b3", "b1", "missing", "b2"], name="building_id"),
+    )
+    locations = pd.DataFrame({
+        "building_id": ["b1", "b2", "b3", "b4"],
+        "lat": [42.0, 42.1, np.nan, 42.3],
+        "lon": [-71.0, -71.1, -71.2, -71.3],
+        "extra": ["a", "b", "c", "d"],
+    })
+
+    merged = merge_with_building_locations(df, locations)
+    pd.testing.assert_frame_equal(merged, _reference_merge(df, locations))
+    assert list(merged["building_id"]) == ["b1", "b2"]
+
+    # Duplicate location ids expand rows as merge does.
+    duplicated = pd.concat([locations, locations.iloc[[0]].assign(lat=43.0)])
+    pd.testing.assert_frame_equal(
+        merge_with_building_locations(df, duplicated),
+        _reference_merge(df, duplicated),
+    )
+
+    no_match = df.rename(index=lambda b: f"x{b}")
+    assert merge_with_building_locations(no_match, locations) is None
+    assert merge_with_building_locations(df.reset_index(drop=True), locations) is None
+
+
+class _FakeS3:
+    """Just enough of an S3 client for listing prefixes and downloading objects."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.downloads = 0
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix, Delimiter, PaginationConfig=None):
+        contents, prefixes = [], set()
+        for key in sorted(self.objects):
+            if not key.startswith(Prefix):
+                continue
+            rest = key[len(Prefix) :]
+            if Delimiter in rest:
+                prefixes.add(Prefix + rest.split(Delimiter)[0] + Delimiter)
+            else:
+                contents.append({"Key": key})
+        common = [{"Prefix": p} for p in sorted(prefixes)]
+        return [{"Contents": contents, "CommonPrefixes": common}]
+
+    def download_fileobj(self, Bucket, Key, Fileobj):
+        self.downloads += 1
+        Fileobj.write(self.objects[Key])
+
+
+def test_s3_data_source_picks_up_newer_runs_of_a_version(tmp_path, monkeypatch):
+    """A re-run under the same version is downloaded rather than served from cache."""
+    pytest.importorskip("scythe.experiments")
+    pytest.importorskip("globi.pipelines")
+    import io
+    from datetime import datetime
+
+    import pandas as pd
+    from scythe.experiments import (
+        BaseExperiment,
+        ExperimentRun,
+        SemVer,
+        VersionedExperiment,
+    )
+
+    from globi.pipelines import simulate_globi_building
+    from globi.tools.visualization import data_sources
+    from globi.tools.visualization.models import S3DataSourceConfig
+
+    monkeypatch.setenv("SCYTHE_STORAGE_BUCKET", "test-bucket")
+    monkeypatch.setattr(data_sources, "_latest_runs", {})
+    client = _FakeS3()
+    exp = BaseExperiment(experiment=simulate_globi_building, run_name="Region/Run")
+    version = VersionedExperiment(
+        base_experiment=exp, version=SemVer.FromString("v1.0.0")
+    )
+
+    def publish(day: int, df: pd.DataFrame) -> None:
+        run = ExperimentRun(
+            versioned_experiment=version, timestamp=datetime(2026, 1, day)
+        )
+        buf = io.BytesIO()
+        df.to_parquet(buf)
+        client.objects[f"{run.final_results_dirkey}Results.pq"] = buf.getvalue()
+
+    source = data_sources.S3DataSource(
+        S3DataSourceConfig(run_name="Region/Run", version="v1.0.0", cache_dir=tmp_path),
+        client=client,
+    )
+    first = _results_frame()
+    publish(1, first)
+    pd.testing.assert_frame_equal(source.load_run_data("Region/Run"), first)
+    pd.testing.assert_frame_equal(source.load_run_data("Region/Run"), first)
+    assert client.downloads == 1
+
+    rerun = _results_frame() * 2
+    publish(2, rerun)
+    monkeypatch.setattr(data_sources, "LATEST_VERSION_TTL_SECONDS", 0.0)
+    pd.testing.assert_frame_equal(source.load_run_data("Region/Run"), rerun)
+    assert source.run_file_path("Region/Run").parent.name == "2026-01-02_00-00-00"
+    assert client.downloads == 2